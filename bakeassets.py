@@ -0,0 +1,157 @@
+"""
+Offline asset pipeline. Bakes every image under src/img and src/prgm/*/tex
+into a display-sized, mipmapped .txo under src/baked and writes
+src/baked/manifest.json, which VRAM in main.py uses to prefer the baked copy.
+
+usage: python bakeassets.py [--force]
+"""
+
+from panda3d.core import Filename, PNMImage, SamplerState, Texture, loadPrcFileData
+from fnmatch import fnmatch
+from json import loads, dump
+import glob
+import os
+import sys
+import time
+
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+loadPrcFileData("", "textures-power-2 none")
+
+OUTPUT = "./src/baked"
+MANIFEST = os.path.join(OUTPUT, "manifest.json")
+SOURCES = ["./src/img/*", "./src/prgm/*/tex/*"]
+EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Largest on-screen size in pixels at the 1280x720 reference resolution.
+DISPLAY_SIZES = {
+    "./src/img/wifi.png": (24, 18),
+    "./src/img/profile.png": (144, 144),
+    "./src/img/rounded_outline.png": (50, 50),
+    "./src/img/pwrBttn.png": (64, 64),
+    "./src/img/lockBackground*.jpg": (1280, 720),
+    "./src/img/windows11background.png": (1280, 720),
+    "./src/prgm/*/tex/icon.png": (43, 43),
+}
+DEFAULT_DISPLAY_SIZE = (256, 256)
+
+
+def nextPow2(n):
+    p = 1
+    while p < n:
+        p *= 2
+    return p
+
+
+def prevPow2(n):
+    p = 1
+    while p * 2 <= n:
+        p *= 2
+    return p
+
+
+def displaySize(path):
+    for pattern, size in DISPLAY_SIZES.items():
+        if fnmatch(path, pattern):
+            return size
+    return DEFAULT_DISPLAY_SIZE
+
+
+def bake(path, manifest, force):
+    stat = os.stat(path)
+    entry = manifest.get(path)
+    if (
+        not force
+        and entry is not None
+        and entry["source_mtime"] == stat.st_mtime_ns
+        and os.path.exists(entry["baked"])
+    ):
+        return entry
+
+    start = time.perf_counter()
+    source = PNMImage()
+    if not source.read(Filename.fromOsSpecific(path)):
+        print(f"skipped {path}: unreadable")
+        return None
+    sourceDecode = time.perf_counter() - start
+
+    width, height = displaySize(path)
+    width = min(prevPow2(source.getXSize()), nextPow2(width))
+    height = min(prevPow2(source.getYSize()), nextPow2(height))
+    scaled = PNMImage(width, height, source.getNumChannels(), source.getMaxval())
+    scaled.gaussianFilterFrom(1.0, source)
+
+    tex = Texture(os.path.basename(path))
+    tex.load(scaled)
+    tex.setMinfilter(SamplerState.FTLinearMipmapLinear)
+    tex.setMagfilter(SamplerState.FTLinear)
+    tex.generateRamMipmapImages()
+
+    bakedPath = os.path.join(OUTPUT, os.path.relpath(path, "./src")) + ".txo"
+    os.makedirs(os.path.dirname(bakedPath), exist_ok=True)
+    tex.write(Filename.fromOsSpecific(bakedPath))
+
+    start = time.perf_counter()
+    Texture().read(Filename.fromOsSpecific(bakedPath))
+    bakedDecode = time.perf_counter() - start
+
+    return {
+        "baked": bakedPath,
+        "size": [width, height],
+        "source_size": [source.getXSize(), source.getYSize()],
+        "source_mtime": stat.st_mtime_ns,
+        "source_bytes": stat.st_size,
+        "source_ram_bytes": source.getXSize()
+        * source.getYSize()
+        * source.getNumChannels(),
+        "baked_bytes": os.path.getsize(bakedPath),
+        "baked_ram_bytes": width * height * source.getNumChannels() * 4 // 3,
+        "source_decode_ms": round(sourceDecode * 1000, 3),
+        "baked_decode_ms": round(bakedDecode * 1000, 3),
+    }
+
+
+def main():
+    force = "--force" in sys.argv
+    try:
+        with open(MANIFEST, "r") as f:
+            manifest = loads(f.read())
+    except (OSError, ValueError):
+        manifest = {}
+
+    paths = sorted(
+        p.replace("\\", "/")
+        for pattern in SOURCES
+        for p in glob.glob(pattern)
+        if p.lower().endswith(EXTENSIONS)
+    )
+    baked = {}
+    for path in paths:
+        entry = bake(path, manifest, force)
+        if entry is not None:
+            baked[path] = entry
+
+    os.makedirs(OUTPUT, exist_ok=True)
+    with open(MANIFEST, "w") as f:
+        dump(baked, f, indent=4)
+
+    print(f"{'asset':<48} {'size':>11} {'decode ms':>17} {'ram bytes':>21}")
+    totals = [0, 0, 0, 0]
+    for path, e in baked.items():
+        ramBytes = e["baked_ram_bytes"]
+        totals[0] += e["source_decode_ms"]
+        totals[1] += e["baked_decode_ms"]
+        totals[2] += e["source_ram_bytes"]
+        totals[3] += ramBytes
+        print(
+            f"{path:<48} {e['size'][0]:>5}x{e['size'][1]:<5} "
+            f"{e['source_decode_ms']:>8.2f}->{e['baked_decode_ms']:<8.2f} "
+            f"{e['source_ram_bytes']:>10}->{ramBytes:<10}"
+        )
+    print(
+        f"total decode {totals[0]:.2f} ms -> {totals[1]:.2f} ms, "
+        f"{totals[2] - totals[3]} texture bytes saved"
+    )
+
+
+if __name__ == "__main__":
+    main()
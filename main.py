@@ -1,6 +1,7 @@
 from panda3d.core import *
 from direct.showbase.ShowBase import ShowBase
 from direct.gui.DirectGui import *
+from direct.showbase.DirectObject import DirectObject
 from panda3d.core import (
     NodePath,
     Vec3,
@@ -11,13 +12,72 @@ from panda3d.core import (
     TransparencyAttrib,
     TextNode,
 )
-from json import loads, dump
+from json import loads, dump, dumps
+from collections import Counter, OrderedDict, deque
 import os
 import atexit
 import time
+import hashlib
+import heapq
+import importlib.util
+import marshal
+import mmap
+import posixpath
+import queue
+import re
+import struct
+import subprocess
+import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
-GLOBALMEM: dict = {}
+
+
+class GLOBALMEM(dict):
+    """
+    Settings store persisted by FILEMGR. Assigning or deleting a top-level
+    key marks it dirty; code that mutates a nested value in place must call
+    markDirty(key) so the change reaches the journal.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.dirty: set[str] = set()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.dirty.add(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            self.dirty.add(key)
+        return super().pop(key, *default)
+
+    def clear(self):
+        self.dirty.update(self.keys())
+        super().clear()
+
+    def markDirty(self, key):
+        self.dirty.add(key)
+
+
+GLOBALMEM = GLOBALMEM()
 DEFAULTS: dict = {
     "AUTH": {"users": {"admin": "admin"}},
     "PANDAPRC": {
@@ -33,47 +93,618 @@ sync-video 0
 """,
         "STARTUP_INJECTOR": "print('No startup injector found.')",
     },
+    "PROFILER": {"ENABLED": True, "OVERLAY": False},
+    "COMPOSITOR": {"ENABLED": False},
+    "FRAMEPACING": {"ENABLED": True, "IDLE_RATE": 10, "IDLE_DELAY": 2.0},
+    "WORKERS": {"POOL_SIZE": 2},
+    "VRAM": {"BUDGET_MB": 256},
+    "PAGES": {"UNLOAD_AFTER": 30.0},
+    "TRANSITIONS": {"SNAPSHOT": False},
+    "HIBERNATE": {"ON_EXIT": False},
+    "TERMINAL": {"SCROLLBACK": 10000},
+    "VFS": {"PATH": "./VDISK", "COMMIT_RATE": 1},
+    "PERSISTENCE": {"FLUSH_RATE": 4, "COMPACT_BYTES": 65536},
+    "VIDEO": {"BUFFER_FRAMES": 8, "PRELOAD_FRAMES": 3, "FPS": 30, "BACKGROUND": ""},
+    "GLYPHCACHE": {"CHARSET": "".join(chr(c) for c in range(32, 127))},
 }
 
-VRAM = {}
+
+class VRAM(dict):
+    class Asset:
+        __slots__ = ("key", "kind", "asset", "bytes", "refs", "owners")
+
+        def __init__(self, key, kind, asset, bytes):
+            self.key = key
+            self.kind = kind
+            self.asset = asset
+            self.bytes = bytes
+            self.refs = 0
+            self.owners: Counter = Counter()
+
+    def __init__(self):
+        super().__init__()
+        self.assets: dict[str, VRAM.Asset] = {}
+        self.byId: dict[int, str] = {}
+        self.unreferenced: OrderedDict[str, None] = OrderedDict()
+        self.budget = 256 * 1024 * 1024
+        self.resident = 0
+        self.baked: dict[str, dict] = {}
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0, "baked": 0}
+
+    def configure(self):
+        config = GLOBALMEM.get("VRAM", DEFAULTS["VRAM"])
+        self.budget = int(config.get("BUDGET_MB", 256) * 1024 * 1024)
+        self.loadBakedManifest(
+            config.get("BAKED_MANIFEST", "./src/baked/manifest.json")
+        )
+
+    def loadBakedManifest(self, path):
+        """
+        Reads the manifest written by bakeassets.py. Textures listed there are
+        loaded from their display-sized .txo instead of the source image.
+        """
+        try:
+            with open(path, "r") as f:
+                manifest = loads(f.read())
+        except (OSError, ValueError):
+            return
+        self.baked = {os.path.abspath(src): entry for src, entry in manifest.items()}
+
+    def resolve(self, key):
+        entry = self.baked.get(key)
+        if entry is None:
+            return key
+        try:
+            if os.stat(key).st_mtime_ns != entry["source_mtime"]:
+                return key
+        except OSError:
+            pass
+        if not os.path.exists(entry["baked"]):
+            return key
+        self.stats["baked"] += 1
+        return os.path.abspath(entry["baked"])
+
+    def _measure(self, kind, asset, path):
+        if kind == "texture":
+            size = (
+                asset.getXSize()
+                * asset.getYSize()
+                * asset.getNumComponents()
+                * asset.getComponentWidth()
+            )
+            return size * 4 // 3 if asset.usesMipmaps() else size
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _register(self, key, kind, asset, path):
+        entry = VRAM.Asset(key, kind, asset, self._measure(kind, asset, path))
+        self.assets[key] = entry
+        self.byId[id(asset)] = key
+        self.resident += entry.bytes
+        self.stats["loads"] += 1
+        return entry
+
+    def _acquire(self, key, kind, owner, path, load):
+        entry = self.assets.get(key)
+        if entry is None:
+            asset = load()
+            if asset is None:
+                return None
+            entry = self._register(key, kind, asset, path)
+        else:
+            self.stats["hits"] += 1
+            self.unreferenced.pop(key, None)
+        entry.refs += 1
+        entry.owners[owner] += 1
+        self._evict()
+        return entry.asset
+
+    def acquireTexture(self, path, owner="SYSTEM"):
+        """
+        Returns a shared texture for path, loading it on first use.
+        Every acquire must be paired with a release by the same owner.
+        """
+        key = os.path.abspath(path)
+        return self._acquire(
+            key,
+            "texture",
+            owner,
+            key,
+            lambda: self["LOADER"].loadTexture(
+                Filename.fromOsSpecific(self.resolve(key))
+            ),
+        )
+
+    def acquireTextureAsync(self, path, callback, owner="SYSTEM"):
+        """
+        Like acquireTexture, but a texture that is not resident yet is read by
+        ASYNCLOADER and handed to the callback on a later frame.
+        """
+        key = os.path.abspath(path)
+        if key in self.assets:
+            callback(self.acquireTexture(key, owner))
+            return
+
+        def loaded(tex):
+            if tex is not None:
+                if key not in self.assets:
+                    self._register(key, "texture", tex, key)
+                tex = self.acquireTexture(key, owner)
+            callback(tex)
+
+        ASYNCLOADER.loadTexture(self.resolve(key), loaded)
+
+    @staticmethod
+    def fontName(key):
+        """
+        The name a font is loaded under, which FontPool also needs to release
+        it.
+        """
+        return Filename.fromOsSpecific(key.split("|")[0]).getFullpath()
+
+    def acquireFont(self, path, owner="SYSTEM", **kwargs):
+        key = os.path.abspath(path) + "|" + repr(sorted(kwargs.items()))
+        return self._acquire(
+            key,
+            "font",
+            owner,
+            path,
+            lambda: self["LOADER"].loadFont(self.fontName(key), **kwargs),
+        )
+
+    def acquireSound(self, path, owner="SYSTEM"):
+        key = os.path.abspath(path)
+        return self._acquire(
+            key, "sound", owner, path, lambda: self["LOADER"].loadSfx(path)
+        )
+
+    def release(self, asset, owner="SYSTEM", unload=False):
+        """
+        Drops one reference to an asset (by object or key). Unreferenced
+        assets stay resident until the byte budget forces them out, unless
+        unload is set, in which case the last reference frees it right away.
+        """
+        if isinstance(asset, str):
+            key = asset if asset in self.assets else os.path.abspath(asset)
+        else:
+            key = self.byId.get(id(asset))
+        entry = self.assets.get(key)
+        if entry is None or entry.refs == 0:
+            return
+        entry.refs -= 1
+        entry.owners[owner] -= 1
+        if entry.owners[owner] <= 0:
+            del entry.owners[owner]
+        if entry.refs == 0:
+            if unload:
+                self._unload(self.assets.pop(key))
+                return
+            self.unreferenced[key] = None
+        self._evict()
+
+    def releaseOwner(self, owner, unload=False):
+        for entry in list(self.assets.values()):
+            for _ in range(entry.owners.get(owner, 0)):
+                self.release(entry.key, owner, unload)
+
+    def _evict(self):
+        while self.resident > self.budget and self.unreferenced:
+            key, _ = self.unreferenced.popitem(last=False)
+            self._unload(self.assets.pop(key))
+
+    def _unload(self, entry: "VRAM.Asset"):
+        self.resident -= entry.bytes
+        self.byId.pop(id(entry.asset), None)
+        self.stats["evictions"] += 1
+        if entry.kind == "texture":
+            TexturePool.releaseTexture(entry.asset)
+            entry.asset.releaseAll()
+        elif entry.kind == "font":
+            FontPool.releaseFont(self.fontName(entry.key))
+        elif entry.kind == "sound":
+            entry.asset.stop()
+            self["LOADER"].unloadSfx(entry.asset)
+
+    def report(self):
+        programs = Counter()
+        assets = {}
+        for entry in self.assets.values():
+            assets[entry.key] = {
+                "kind": entry.kind,
+                "bytes": entry.bytes,
+                "refs": entry.refs,
+                "owners": dict(entry.owners),
+            }
+            for owner in entry.owners:
+                programs[owner] += entry.bytes
+        return {
+            "resident": self.resident,
+            "budget": self.budget,
+            "assets": assets,
+            "owners": dict(programs),
+            **self.stats,
+        }
+
+
+VRAM = VRAM()
+
+
+class GLYPHCACHE:
+    GLYPHS_PER_RUN = 16
+
+    def __init__(self):
+        self.charset = "".join(chr(c) for c in range(32, 127))
+        self.directory = "./src/fonts/cache"
+        self.fonts: dict[int, tuple] = {}
+        self.stats = {"cached": 0, "built": 0, "fallbacks": 0}
+
+    def configure(self):
+        config = GLOBALMEM.get("GLYPHCACHE", DEFAULTS["GLYPHCACHE"])
+        self.charset = config.get("CHARSET", self.charset)
+
+    def cachePath(self, fontPath, pixelsPerUnit):
+        digest = hashlib.sha1(self.charset.encode())
+        with open(fontPath, "rb") as f:
+            digest.update(f.read())
+        name = os.path.splitext(os.path.basename(fontPath))[0]
+        return os.path.join(
+            self.directory, f"{name}-{digest.hexdigest()[:16]}-{pixelsPerUnit}.bam"
+        )
+
+    def attach(self, fontPath, font: DynamicTextFont, pixelsPerUnit):
+        """
+        Pairs a dynamic font with its prebaked glyph pages. If no cache exists
+        for this font file, size and character set, it is built when idle.
+        """
+        path = self.cachePath(fontPath, pixelsPerUnit)
+        if os.path.exists(path):
+            static = VRAM["LOADER"].loadFont(
+                Filename.fromOsSpecific(os.path.abspath(path))
+            )
+            if static is not None and static.isValid():
+                self.fonts[id(font)] = (static, frozenset(self.charset))
+                self.stats["cached"] += 1
+                return
+        TaskManager.addTask(
+            self.build,
+            font,
+            path,
+            iter(self.charset),
+            NodePath("glyphs"),
+            priority=TaskManager.priorities.LOW,
+            rate=TaskManager.rates.IDLE,
+            name="GLYPHCACHE.build",
+        )
+
+    def _point(self, x, z):
+        vdata = GeomVertexData("dot", GeomVertexFormat.getV3(), Geom.UHStatic)
+        GeomVertexWriter(vdata, "vertex").addData3(x, 0, z)
+        points = GeomPoints(Geom.UHStatic)
+        points.addVertex(0)
+        geom = Geom(vdata)
+        geom.addPrimitive(points)
+        return geom
+
+    def build(self, font: DynamicTextFont, path, chars, root: NodePath):
+        """
+        Rasterizes the character set, GLYPHS_PER_RUN characters per idle run,
+        and then writes it out in the layout StaticTextFont reads: one
+        GeomNode per character code holding the glyph quad plus a point at
+        its advance, and a "ds" node for line height.
+        """
+        dimensions = LVecBase4()
+        texcoords = LVecBase4()
+        for _ in range(self.GLYPHS_PER_RUN):
+            ch = next(chars, None)
+            if ch is None:
+                break
+            glyph = font.getGlyph(ord(ch))
+            if glyph is None:
+                continue
+            node = GeomNode(str(ord(ch)))
+            if glyph.getQuad(dimensions, texcoords):
+                cm = CardMaker("glyph")
+                cm.setFrame(dimensions[0], dimensions[2], dimensions[1], dimensions[3])
+                cm.setUvRange(
+                    (texcoords[0], texcoords[1]), (texcoords[2], texcoords[3])
+                )
+                node.addGeom(cm.generate().getGeom(0), glyph.getState())
+            node.addGeom(self._point(glyph.getAdvance(), 0))
+            root.attachNewNode(node)
+        else:
+            # Characters left; the next idle run continues from here.
+            return
+        ds = GeomNode("ds")
+        ds.addGeom(self._point(0, font.getLineHeight()))
+        root.attachNewNode(ds)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            root.writeBamFile(Filename.fromOsSpecific(os.path.abspath(path)))
+            self.stats["built"] += 1
+        except OSError as e:
+            print("Could not write glyph cache: ", e)
+        return TaskManager.DONE
+
+    def fontFor(self, text, font: TextFont = None):
+        """
+        Returns the prebaked font when it covers every character of text,
+        otherwise the dynamic font, which rasterizes unseen glyphs on demand.
+        """
+        font = font if font is not None else VRAM["WIN11FONT"]
+        cached = self.fonts.get(id(font))
+        if cached is not None and cached[1].issuperset(text):
+            return cached[0]
+        if cached is not None:
+            self.stats["fallbacks"] += 1
+        return font
+
+
+GLYPHCACHE = GLYPHCACHE()
 
 
 class UIManager:
     def __init__(self):
         self.pageStack: dict[str, UIManager.Window] = {}
+        self.factories: dict[str, callable] = {}
+        self.unloadable: set[str] = set()
         self.lastPage = None
         self.activePage = None
+        self.sweepTask = None
+        self.transition: UIManager.Transition = None
+        self.transitionTask = None
+        self.fromCard: NodePath = None
+        self.toCard: NodePath = None
+        self.stats = {"transitions": 0, "coalesced": 0, "reversed": 0, "snapshots": 0}
+
+    def addPageFactory(self, pageName, factory, unloadable=False):
+        """
+        Registers a page that is built by factory() the first time it is
+        shown. Unloadable pages are destroyed, and their assets released,
+        once they have been hidden for PAGES.UNLOAD_AFTER seconds; the next
+        goToPage/fadeToPage builds them again.
+        """
+        self.factories[pageName] = factory
+        if unloadable:
+            self.unloadable.add(pageName)
+            if self.sweepTask is None:
+                self.sweepTask = TaskManager.addTask(
+                    self.unloadHiddenPages,
+                    priority=TaskManager.priorities.LOW,
+                    rate=1,
+                    name="UIManager.unloadHiddenPages",
+                    wakes=False,
+                )
+
+    def getPage(self, pageName):
+        if pageName not in self.pageStack and pageName in self.factories:
+            self.factories[pageName]()
+        return self.pageStack.get(pageName)
+
+    def isLoaded(self, pageName):
+        return pageName in self.pageStack
 
     def goToPage(self, pageName):
-        if pageName in self.pageStack:
-            if self.activePage is not None:
-                self.activePage.hide()
-            self.pageStack[pageName].show()
-            self.lastPage = self.activePage
-            self.activePage = self.pageStack[pageName]
+        page = self.getPage(pageName)
+        if page is not None:
+            self.finishTransition()
+            if self.activePage is not page:
+                if self.activePage is not None:
+                    self.activePage.hide()
+                self.lastPage = self.activePage
+                self.activePage = page
+            page.show()
         else:
             print(f"Page '{pageName}' Not Found")
 
     def fadeToPage(self, pageName, time):
-        if pageName in self.pageStack:
-            for root in [self.activePage.root, self.activePage.root2]:
-                root.setTransparency(TransparencyAttrib.MAlpha)
-            for root in [self.pageStack[pageName].root, self.pageStack[pageName].root2]:
-                root.setTransparency(TransparencyAttrib.MAlpha)
-            self.pageStack[pageName].fadeIn(time)
+        page = self.getPage(pageName)
+        if page is not None:
+            self.transitionTo(page, time)
+        else:
+            print(f"Page '{pageName}' Not Found")
 
-            def final(t):
-                self.lastPage = self.activePage
-                self.activePage = self.pageStack[pageName]
-                self.lastPage.hide()
+    def transitionTo(self, page: "UIManager.Window", duration):
+        """
+        Fades page in over the active page. Only one transition is ever in
+        flight: fading to its target again is ignored, fading back to the
+        page it is leaving reverses it from the current alpha, and any other
+        target completes it before starting the new one.
+        """
+        current = self.transition
+        if current is not None:
+            if current.pageFor(current.target) is page:
+                self.stats["coalesced"] += 1
+                return
+            if current.pageFor(1 - current.target) is page:
+                current.target = 1 - current.target
+                self.stats["reversed"] += 1
+                return
+            self.finishTransition()
+        if page is self.activePage or self.activePage is None:
+            self.goToPage(page.name)
+            return
 
-            base.doMethodLater(
-                time, self.activePage.fadeOut, "fadeToPage", extraArgs=[time]
+        transition = UIManager.Transition(self.activePage, page, duration)
+        snapshot = GLOBALMEM.get("TRANSITIONS", DEFAULTS["TRANSITIONS"])["SNAPSHOT"]
+        if not (
+            snapshot
+            and page.parent is None
+            and self.activePage.parent is None
+            and self._beginSnapshot(transition)
+        ):
+            page.show()
+            for root in [page.root, page.root2]:
+                root.reparentTo(root.getParent())
+                root.setTransparency(TransparencyAttrib.MAlpha)
+                root.setAlphaScale(0)
+        self.transition = transition
+        self.stats["transitions"] += 1
+        if self.transitionTask is None:
+            self.transitionTask = TaskManager.addTask(
+                self.updateTransition,
+                priority=TaskManager.priorities.HIGH,
+                name="UIManager.updateTransition",
             )
 
-            base.doMethodLater(time, final, "fadeToPage_final")
+    def updateTransition(self):
+        transition = self.transition
+        if transition is None:
+            self.transitionTask = None
+            return TaskManager.DONE
+        FRAMEPACER.wake()
+        if transition.capture is not None:
+            if globalClock.getFrameCount() <= transition.captureFrame:  # type: ignore
+                return
+            self._endCapture(transition)
+        dt = globalClock.getDt()  # type: ignore
+        step = dt / transition.duration if transition.duration > 0 else 1
+        if transition.target == 1:
+            transition.progress = min(1.0, transition.progress + step)
         else:
-            print(f"Page '{pageName}' Not Found")
+            transition.progress = max(0.0, transition.progress - step)
+        self._applyTransition(transition)
+        if transition.progress == transition.target:
+            self.finishTransition()
+            self.transitionTask = None
+            return TaskManager.DONE
+
+    def _applyTransition(self, transition: "UIManager.Transition"):
+        if transition.snapshot:
+            self.toCard.setAlphaScale(transition.progress)
+        else:
+            for root in [transition.toPage.root, transition.toPage.root2]:
+                root.setAlphaScale(transition.progress)
+
+    def finishTransition(self):
+        """
+        Jumps the transition in flight, if any, to its target.
+        """
+        transition = self.transition
+        if transition is None:
+            return
+        self.transition = None
+        if transition.capture is not None:
+            self._endCapture(transition)
+        shown = transition.pageFor(transition.target)
+        hidden = transition.pageFor(1 - transition.target)
+        if transition.snapshot:
+            self.fromCard.hide()
+            self.toCard.hide()
+        for root in [transition.toPage.root, transition.toPage.root2]:
+            root.setAlphaScale(1)
+        hidden.hide()
+        shown.show()
+        if shown is not self.activePage:
+            self.lastPage = self.activePage
+            self.activePage = shown
+
+    def _snapshotCard(self, name):
+        cm = CardMaker(name)
+        cm.setFrame(-1, 1, -1, 1)
+        card = render2d.attachNewNode(cm.generate())  # type: ignore
+        card.setTransparency(TransparencyAttrib.MAlpha)
+        card.setBin("background", 10)
+        card.hide()
+        return card
+
+    def _beginSnapshot(self, transition: "UIManager.Transition"):
+        """
+        Swaps both live pages for two fullscreen cards. Pages are captured by
+        rendering only their own nodes offscreen, so app windows above them
+        never end up in a card. The page being left stays live until its
+        capture has rendered; the incoming page uses the snapshot cached the
+        last time it was left, if it has one. Returns False if offscreen
+        buffers are unavailable.
+        """
+        fromPage, toPage = transition.fromPage, transition.toPage
+        captures = [self._captureSnapshot(fromPage, live=True)]
+        if toPage.snapshot is None:
+            captures.append(self._captureSnapshot(toPage))
+        if None in captures:
+            for capture in captures:
+                if capture is not None:
+                    self._releaseCapture(capture)
+            return False
+        if self.fromCard is None:
+            self.fromCard = self._snapshotCard("transition_from")
+            self.toCard = self._snapshotCard("transition_to")
+            self.toCard.setBin("background", 11)
+        transition.snapshot = True
+        transition.capture = captures
+        transition.captureFrame = globalClock.getFrameCount()  # type: ignore
+        toPage.visible = True
+        toPage.hiddenAt = None
+        self.toCard.setAlphaScale(0)
+        if toPage.snapshot is not None:
+            self.toCard.setTexture(toPage.snapshot, 1)
+            self.toCard.show()
+        self.stats["snapshots"] += 1
+        return True
+
+    def _captureSnapshot(self, page: "UIManager.Window", live=False):
+        """
+        Renders a page's roots into a texture on the next frame. A live page
+        is instanced into the offscreen scene so it keeps drawing on screen
+        meanwhile; any other page is moved there for the one frame.
+        """
+        tex = Texture(f"snapshot_{page.name}")
+        buffer = base.win.makeTextureBuffer(
+            f"snapshot_{page.name}", base.win.getXSize(), base.win.getYSize(), tex
+        )
+        if buffer is None:
+            return None
+        buffer.setClearColor((0, 0, 0, 1))
+        buffer.setClearColorActive(True)
+        scene = NodePath(f"snapshot_scene_{page.name}")
+        scene.setDepthTest(False)
+        scene.setDepthWrite(False)
+        lens = OrthographicLens()
+        lens.setFilmSize(2, 2)
+        lens.setNearFar(-1000, 1000)
+        camera = scene.attachNewNode(Camera(f"snapshot_cam_{page.name}", lens))
+        buffer.makeDisplayRegion().setCamera(camera)
+        aspect = scene.attachNewNode("aspect")
+        aspect.setScale(1 / base.getAspectRatio(), 1, 1)
+        if live:
+            page.root2.instanceTo(scene)
+            page.root.instanceTo(aspect)
+        else:
+            page.root2.reparentTo(scene)
+            page.root.reparentTo(aspect)
+            page.root.show()
+            page.root2.show()
+        buffer.setOneShot(True)
+        return page, live, buffer, scene, tex
+
+    def _releaseCapture(self, capture):
+        page, live, buffer, scene, _ = capture
+        if not live:
+            page.root.reparentTo(aspect2d)  # type: ignore
+            page.root2.reparentTo(render2d)  # type: ignore
+            page.root.hide()
+            page.root2.hide()
+        base.graphicsEngine.removeWindow(buffer)
+        # Removing the scene only drops the instance links of a live page.
+        scene.removeNode()
+
+    def _endCapture(self, transition: "UIManager.Transition"):
+        captures = transition.capture
+        transition.capture = None
+        for capture in captures:
+            self._releaseCapture(capture)
+            page, tex = capture[0], capture[-1]
+            page.snapshot = tex
+            if page is transition.fromPage:
+                self.fromCard.setTexture(tex, 1)
+                self.fromCard.setAlphaScale(1)
+                self.fromCard.show()
+                page.root.hide()
+                page.root2.hide()
+            else:
+                self.toCard.setTexture(tex, 1)
+                self.toCard.show()
 
     def goBack(self):
         if self.lastPage is not None:
@@ -94,60 +725,274 @@ class UIManager:
         else:
             print("Page Already Exists")
 
+    def prefetchPage(self, pageName):
+        """
+        Builds a page in spare frame time so the next goToPage/fadeToPage
+        does not have to.
+        """
+
+        def build():
+            self.getPage(pageName)
+            return TaskManager.DONE
+
+        if pageName not in self.pageStack and pageName in self.factories:
+            TaskManager.addTask(
+                build,
+                priority=TaskManager.priorities.LOW,
+                rate=TaskManager.rates.IDLE,
+                name=f"UIManager.prefetchPage:{pageName}",
+                wakes=False,
+            )
+
+    def unloadPage(self, pageName):
+        page = self.pageStack.get(pageName)
+        if page is None:
+            return
+        if self.lastPage is page:
+            self.lastPage = None
+        if self.activePage is page:
+            self.activePage = None
+        page.destroy()
+
+    def unloadHiddenPages(self):
+        unloadAfter = GLOBALMEM.get("PAGES", DEFAULTS["PAGES"])["UNLOAD_AFTER"]
+        now = time.perf_counter()
+        for pageName in self.unloadable:
+            page = self.pageStack.get(pageName)
+            if (
+                page is not None
+                and page is not self.activePage
+                and not page.visible
+                and page.hiddenAt is not None
+                and now - page.hiddenAt >= unloadAfter
+            ):
+                self.unloadPage(pageName)
+
+    class Transition:
+        __slots__ = (
+            "fromPage",
+            "toPage",
+            "duration",
+            "progress",
+            "target",
+            "snapshot",
+            "capture",
+            "captureFrame",
+        )
+
+        def __init__(self, fromPage, toPage, duration):
+            self.fromPage: UIManager.Window = fromPage
+            self.toPage: UIManager.Window = toPage
+            self.duration = duration
+            self.progress = 0.0
+            self.target = 1
+            self.snapshot = False
+            self.capture = None
+            self.captureFrame = 0
+
+        def pageFor(self, target):
+            return self.toPage if target == 1 else self.fromPage
+
     class VideoPlayer:
+        """
+        Streams a video through a MovieVideoCursor. A decoder thread fills a
+        bounded ring buffer of frames ahead of the playback clock; the render
+        thread uploads only the newest frame that is due and drops the rest.
+        Once playback starts the cursor is only touched by the decoder thread;
+        the render thread receives copies of the decoded RAM images.
+        """
+
         def __init__(self, name, videoPath, parent: "UIManager.Window" = None):
+            config = GLOBALMEM.get("VIDEO", DEFAULTS["VIDEO"])
             self.name = name
             self.videoPath = videoPath
-            self.tex = MovieTexture(self.name)
-            if self.tex.read(videoPath):
-                self.tex.setLoop(False)
-                cm = CardMaker("fullscreenCard")
-                cm.setFrameFullscreenQuad()
-                cm.setUvRange(self.tex)
-                card = NodePath(cm.generate())
-                card.reparentTo(parent if parent is not None else render2d)
-                card.setTexture(self.tex)
-                self.card = card
-                self.play()
-            else:
-                with open(videoPath, "rb") as fp:
-                    print("File Found, " + str(len(fp.read())) + " bytes")
-                print("Failed to load Video")
+            self.capacity = max(1, config.get("BUFFER_FRAMES", 8))
+            self.preloadFrames = min(self.capacity, config.get("PRELOAD_FRAMES", 3))
+            self.frameTime = 1 / config.get("FPS", 30)
+            self.frames = deque()
+            self.condition = threading.Condition()
+            self.stats = {"decoded": 0, "dropped": 0, "late": 0, "presented": 0}
+            self.loop = False
+            self.rate = 1.0
+            self.playing = False
+            self.clockStart = None
+            self.position = 0.0
+            self.decodeTime = 0.0
+            self.loopOffset = 0.0
+            self.eof = False
+            self.stopped = False
+            self.thread = None
+            self.task = None
+            self.card = None
+            self.tex = None
+
+            video = MovieVideo.get(Filename.fromOsSpecific(videoPath))
+            self.cursor = video.open() if video is not None else None
+            if self.cursor is None:
+                size = os.path.getsize(videoPath) if os.path.isfile(videoPath) else 0
+                print(f"Failed to load Video '{videoPath}' ({size} bytes)")
+                return
+            self.length = self.cursor.length()
+            self.tex = Texture(self.name)
+            self.cursor.setupTexture(self.tex)
+            self.staging = Texture(self.name + "_decode")
+            self.cursor.setupTexture(self.staging)
+            cm = CardMaker("fullscreenCard")
+            cm.setFrameFullscreenQuad()
+            cm.setUvRange(self.tex)
+            card = NodePath(cm.generate())
+            card.reparentTo(
+                (parent.root2 if isinstance(parent, UIManager.Window) else parent)
+                if parent is not None
+                else render2d
+            )
+            card.setTexture(self.tex)
+            card.setBin("background", 1)
+            self.card = card
+
+            self.thread = threading.Thread(
+                target=self.decode_loop, name=f"VideoPlayer-{name}", daemon=True
+            )
+            self.thread.start()
+            self.task = TaskManager.addTask(
+                self.update,
+                priority=TaskManager.priorities.HIGH,
+                name=f"VideoPlayer.update:{name}",
+                wakes=False,
+            )
+            self.play()
+
+        def clock(self):
+            if self.clockStart is None:
+                return self.position
+            return self.position + (time.perf_counter() - self.clockStart) * self.rate
+
+        def decode_loop(self):
+            # Media time only moves forward one frame at a time (or wraps to
+            # 0 on loop), so the cursor decodes sequentially and only seeks
+            # when frames are skipped to catch up.
+            while True:
+                with self.condition:
+                    while not self.stopped and (
+                        self.eof or len(self.frames) >= self.capacity
+                    ):
+                        self.condition.wait()
+                    if self.stopped:
+                        return
+                    behind = self.clock() - self.frameTime
+                    if self.clockStart is not None and self.decodeTime < behind:
+                        skipped = int((behind - self.decodeTime) / self.frameTime)
+                        self.decodeTime += skipped * self.frameTime
+                        self.stats["dropped"] += skipped
+                    timestamp = self.decodeTime
+                    mediaTime = timestamp - self.loopOffset
+                    if mediaTime >= self.length:
+                        if self.loop:
+                            self.loopOffset += self.length
+                        else:
+                            self.eof = True
+                        continue
+                self.cursor.setTime(mediaTime, 0)
+                buffer = self.cursor.fetchBuffer()
+                image = None
+                if buffer is not None:
+                    self.cursor.applyToTexture(buffer, self.staging, 0)
+                    image = self.staging.getRamImage().getData()
+                with self.condition:
+                    if image is None:
+                        self.eof = True
+                        continue
+                    self.frames.append((timestamp, image))
+                    self.stats["decoded"] += 1
+                    self.decodeTime = timestamp + self.frameTime
+
+        def update(self):
+            with self.condition:
+                if self.stopped:
+                    self.task = None
+                    return TaskManager.DONE
+                if self.playing and self.clockStart is None:
+                    if len(self.frames) < self.preloadFrames and not self.eof:
+                        return
+                    self.clockStart = time.perf_counter()
+                now = self.clock()
+                due = None
+                while self.frames and self.frames[0][0] <= now:
+                    if due is not None:
+                        self.stats["dropped"] += 1
+                    due = self.frames.popleft()
+                if due is not None:
+                    self.condition.notify()
+            if due is None:
+                return
+            if now - due[0] > self.frameTime:
+                self.stats["late"] += 1
+            self.tex.setRamImage(due[1])
+            self.stats["presented"] += 1
+            # Only a newly decoded frame on screen keeps the desktop at full
+            # rate; a paused, drained or hidden player lets the pacer idle.
+            if not self.card.isHidden():
+                FRAMEPACER.wake()
 
         def stop(self):
-            try:
-                self.tex.stop()
-            except:
-                pass
+            with self.condition:
+                self.position = self.clock()
+                self.clockStart = None
+                self.playing = False
 
         def play(self):
-            try:
-                self.tex.play()
-            except:
-                pass
+            with self.condition:
+                if self.eof and not self.frames:
+                    self.position = 0.0
+                    self.decodeTime = 0.0
+                    self.loopOffset = 0.0
+                    self.clockStart = None
+                    self.eof = False
+                    self.condition.notify()
+                self.playing = True
 
         def setSpeed(self, speed):
-            try:
-                self.tex.setPlayRate(speed)
-            except:
-                pass
+            with self.condition:
+                self.position = self.clock()
+                if self.clockStart is not None:
+                    self.clockStart = time.perf_counter()
+                self.rate = speed
 
         def getSpeed(self):
-            try:
-                return self.tex.getPlayRate()
-            except:
-                return 0
+            return self.rate if self.playing else 0
 
         def setLoop(self, loop):
-            try:
-                self.tex.setLoop(loop)
-            except:
-                pass
+            with self.condition:
+                self.loop = loop
+                if loop and self.eof:
+                    self.eof = False
+                    self.condition.notify()
+
+        def report(self):
+            with self.condition:
+                return dict(self.stats, buffered=len(self.frames))
+
+        def destroy(self):
+            with self.condition:
+                self.stopped = True
+                self.frames.clear()
+                self.condition.notify_all()
+            if self.task is not None:
+                TaskManager.removeTask(self.task)
+                self.task = None
+            if self.card is not None:
+                self.card.removeNode()
+                self.card = None
 
     class Window:
         def __init__(self, name, UIMgr: "UIManager", parent: "UIManager.Window" = None):
             self.name = name
             self.visible = False
+            self.hiddenAt = None
+            self.assets = []
+            self.widgets = []
+            self.snapshot: Texture = None
+            self.UIMgr = UIMgr
             self.parent = None if parent is None else parent
             self.children = []
             self.children_dict = {}
@@ -190,14 +1035,35 @@ class UIManager:
 
         def show(self):
             self.visible = True
+            self.hiddenAt = None
             self.root.show()
             self.root2.show()
 
         def hide(self):
+            # Only pages that were shown and then left start the unload
+            # timer, so prefetched pages stay built until they are used.
+            if self.visible:
+                self.hiddenAt = time.perf_counter()
             self.visible = False
             self.root.hide()
             self.root2.hide()
 
+        def acquireTexture(self, path):
+            """
+            Loads a texture owned by this page; destroy() releases it.
+            """
+            tex = VRAM.acquireTexture(path, owner=f"page:{self.name}")
+            self.assets.append(tex)
+            return tex
+
+        def addWidget(self, widget):
+            """
+            Tracks a DirectGui/Onscreen widget owned by this page; destroy()
+            destroys it.
+            """
+            self.widgets.append(widget)
+            return widget
+
         def showParent(self):
             if not self.parent is None:
                 self.parent.show()
@@ -207,17 +1073,24 @@ class UIManager:
                 self.parent.hide()
 
         def destroy(self):
-            for child in self.children:
-                child.removeNode()
-            for index, child in enumerate(self.children_dict):
-                child.removeNode
+            for child in list(self.children):
+                child.destroy()
             self.children.clear()
             self.children_dict.clear()
+            for widget in self.widgets:
+                widget.destroy()
+            self.widgets.clear()
+            for asset in self.assets:
+                VRAM.release(asset, owner=f"page:{self.name}", unload=True)
+            self.assets.clear()
+            self.snapshot = None
             self.root.removeNode()
             self.root2.removeNode()
             self.childrenNode.removeNode()
             if self.parent is not None:
                 self.parent.children.remove(self)
+            if self.UIMgr.pageStack.get(self.name) is self:
+                del self.UIMgr.pageStack[self.name]
             self.visible = False
             self.parent = None
             del self
@@ -227,6 +1100,8 @@ class UIManager:
             parentWindow.children_dict[self.name] = self
 
         def fadeIn(self, time):
+            self.visible = True
+            self.hiddenAt = None
             for win in [self.root, self.root2]:
                 win.setTransparency(TransparencyAttrib.MAlpha)
                 win.setAlphaScale(0)
@@ -256,52 +1131,426 @@ class API:
         WIDGET = "WIDGET"
 
     class WindowStack:
-        windows: dict[str, "API.Window"] = {}
-        activeWindow: "API.Window" = None
-        lastWindow: "API.Window" = None
-        globalID = 0
-        globalBin = 0
+        RENORMALIZE_LIMIT = 1000
+
+        def __init__(self):
+            self.windows: dict[int, "API.Window"] = {}
+            self.activeWindow: "API.Window" = None
+            self.lastWindow: "API.Window" = None
+            self.bottom: "API.Window" = None
+            self.top: "API.Window" = None
+            self.globalID = 0
+            self.batchDepth = 0
+            self.batched: list["API.Window"] = []
 
         def getId(self):
             self.globalID += 1
             return self.globalID
 
-        def getBin(self):
-            self.globalBin += 1
-            return self.globalBin
+        def _unlink(self, window: "API.Window"):
+            if window.zPrev is not None:
+                window.zPrev.zNext = window.zNext
+            else:
+                self.bottom = window.zNext
+            if window.zNext is not None:
+                window.zNext.zPrev = window.zPrev
+            else:
+                self.top = window.zPrev
+            window.zPrev = None
+            window.zNext = None
+
+        def _linkTop(self, window: "API.Window"):
+            window.zPrev = self.top
+            window.zNext = None
+            if self.top is not None:
+                self.top.zNext = window
+            else:
+                self.bottom = window
+            self.top = window
+            sort = window.zPrev.zSort + 1 if window.zPrev is not None else 1
+            if sort > self.RENORMALIZE_LIMIT:
+                self.renormalize()
+            else:
+                self._setSort(window, sort)
 
-        def addWindow(self, window: "API.Window", name: str):
+        def _linkBottom(self, window: "API.Window"):
+            window.zNext = self.bottom
+            window.zPrev = None
+            if self.bottom is not None:
+                self.bottom.zPrev = window
+            else:
+                self.top = window
+            self.bottom = window
+            sort = window.zNext.zSort - 1 if window.zNext is not None else 1
+            if sort < 1:
+                self.renormalize()
+            else:
+                self._setSort(window, sort)
+
+        def _setSort(self, window: "API.Window", sort):
+            window.zSort = sort
+            window.root.setBin("fixed", sort)
+            if window.compositeCard is not None:
+                window.compositeCard.setBin("fixed", sort)
+
+        def renormalize(self):
+            """
+            Reassigns compact sort values 1..n from bottom to top.
+            """
+            sort = 1
+            window = self.bottom
+            while window is not None:
+                self._setSort(window, sort)
+                sort += 1
+                window = window.zNext
+
+        def iterWindows(self):
+            """
+            Yields windows from topmost to bottommost.
+            """
+            window = self.top
+            while window is not None:
+                yield window
+                window = window.zPrev
+
+        @contextmanager
+        def batch(self):
+            """
+            Defers stacking and focus for windows added inside the batch. When
+            the outermost batch exits they are linked above the existing stack
+            in zSort order (ties in creation order) and the topmost one is
+            focused once.
+            """
+            self.batchDepth += 1
+            try:
+                yield self
+            finally:
+                self.batchDepth -= 1
+                if self.batchDepth == 0 and self.batched:
+                    batched, self.batched = self.batched, []
+                    batched.sort(key=lambda window: window.zSort)
+                    for window in batched:
+                        self._linkTop(window)
+                    self._setActive(self.top)
+                    for window in batched:
+                        if window is not self.activeWindow:
+                            API.Compositor.composite(window)
+
+        def addWindow(self, window: "API.Window", name: int):
             self.windows[name] = window
-            self.lastWindow = self.activeWindow
-            self.activeWindow = window
-            if self.lastWindow:
-                self.lastWindow.defocusCommand()
-            self.activeWindow.root.setBin("fixed", self.getBin())
-
-        def removeWindow(self, name: str):
-            if name in self.windows:
-                self.windows[name].destroy()
-                del self.windows[name]
-                if self.lastWindow:
-                    self.focusWindow(self.lastWindow.id)
-
-        def getWindow(self, name: str):
+            SEARCH.addWindow(window)
+            window.zPrev = None
+            window.zNext = None
+            if self.batchDepth > 0:
+                self.batched.append(window)
+                return
+            self._linkTop(window)
+            self._setActive(window)
+
+        def getWindow(self, name: int):
             return self.windows.get(name, None)
 
-        def removeWindow(self, name: str):
-            if name in self.windows:
-                del self.windows[name]
-                if self.lastWindow:
-                    self.focusWindow(self.lastWindow.id)
-
-        def focusWindow(self, name: str):
-            if name in self.windows:
-                window = self.windows[name]
-                window.root.setBin("fixed", self.getBin())
-                self.activeWindow = window
-                if self.lastWindow:
-                    self.lastWindow.defocusCommand()
-                self.lastWindow = window
+        def removeWindow(self, name: int):
+            window = self.windows.pop(name, None)
+            if window is None:
+                return
+            SEARCH.removeWindow(window)
+            if window in self.batched:
+                self.batched.remove(window)
+            else:
+                self._unlink(window)
+            if self.lastWindow is window:
+                self.lastWindow = None
+            if self.activeWindow is window:
+                self.activeWindow = None
+                if self.top is not None:
+                    self._setActive(self.top)
+
+        def focusWindow(self, name: int):
+            window = self.windows.get(name)
+            if window is None:
+                return
+            if window is not self.top:
+                self._unlink(window)
+                self._linkTop(window)
+            self._setActive(window)
+
+        def restack(self, windows: list["API.Window"]):
+            """
+            Moves windows, listed bottom to top, above the rest of the stack
+            in that order and focuses the topmost window.
+            """
+            for window in windows:
+                if self.windows.get(window.id) is window:
+                    self._unlink(window)
+                    self._linkTop(window)
+            if self.top is not None:
+                self._setActive(self.top)
+
+        def lowerWindow(self, name: int):
+            window = self.windows.get(name)
+            if window is None or window is self.bottom:
+                return
+            self._unlink(window)
+            self._linkBottom(window)
+            if self.activeWindow is window:
+                self._setActive(self.top)
+
+        def _setActive(self, window: "API.Window"):
+            if window is self.activeWindow:
+                return
+            previous = self.activeWindow
+            if previous is not None:
+                self.lastWindow = previous
+            self.activeWindow = window
+            API.Compositor.uncomposite(window)
+            if previous is not None:
+                API.Compositor.composite(previous)
+                previous.defocusCommand()
+
+        def windowAt(self, x, y):
+            """
+            Returns the topmost window containing the aspect2d point (x, y).
+            """
+            for window in self.iterWindows():
+                if window.root.isEmpty() or window.root.isHidden():
+                    continue
+                xmin, xmax, ymin, ymax = window.getFrameSize()
+                px, py = window.position
+                if px + xmin <= x <= px + xmax and py + ymin <= y <= py + ymax:
+                    return window
+            return None
+
+        def routeClick(self):
+            if not base.mouseWatcherNode.hasMouse():
+                return
+            mouse = base.mouseWatcherNode.getMouse()
+            window = self.windowAt(mouse.x * (1280 / 720), mouse.y)
+            if window is not None:
+                self.focusWindow(window.id)
+
+    class WindowController:
+        MOVE = "MOVE"
+        RESIZE = "RESIZE"
+        SNAP_MARGIN = 0.02
+        MIN_SIZE = (160, 100)
+        WORKAREA_TOP = 1
+        WORKAREA_BOTTOM = -0.85
+
+        def __init__(self):
+            self.window: "API.Window" = None
+            self.mode = None
+            self.lastMousePos = (0, 0)
+            self.events = DirectObject()
+
+        def begin(self, window: "API.Window", mode):
+            """
+            Starts moving or resizing a window. The drag task only exists
+            between this call and end(), so idle windows cost nothing per frame.
+            """
+            if self.window is not None:
+                self.end()
+            if not base.mouseWatcherNode.hasMouse():
+                return
+            mouse = base.mouseWatcherNode.getMouse()
+            self.window = window
+            self.mode = mode
+            self.lastMousePos = (mouse.x, mouse.y)
+            API.WindowStack.focusWindow(window.id)
+            if mode == self.MOVE and window.restoreGeometry is not None:
+                window.setGeometry(size=window.restoreGeometry[1])
+                window.restoreGeometry = None
+            if mode == self.MOVE:
+                API.Compositor.composite(window)
+            taskMgr.add(self.drag_task, "window_drag")  # type: ignore
+            self.events.accept("mouse1-up", self.end)
+
+        def end(self):
+            if self.window is None:
+                return
+            taskMgr.remove("window_drag")  # type: ignore
+            self.events.ignore("mouse1-up")
+            window, mode = self.window, self.mode
+            self.window = None
+            self.mode = None
+            if mode == self.MOVE and not window.root.isEmpty():
+                self.snap(window)
+                if API.WindowStack.activeWindow is window:
+                    API.Compositor.uncomposite(window)
+
+        def release(self, window: "API.Window"):
+            if self.window is window:
+                self.window = None
+                self.mode = None
+                taskMgr.remove("window_drag")  # type: ignore
+                self.events.ignore("mouse1-up")
+
+        def snap(self, window: "API.Window"):
+            if not base.mouseWatcherNode.hasMouse():
+                return
+            mouse = base.mouseWatcherNode.getMouse()
+            height = (self.WORKAREA_TOP - self.WORKAREA_BOTTOM) * 360
+            centerZ = (self.WORKAREA_TOP + self.WORKAREA_BOTTOM) / 2
+            if mouse.y >= 1 - self.SNAP_MARGIN:
+                geometry = ((0, centerZ), (1280, height))
+            elif mouse.x <= -1 + self.SNAP_MARGIN:
+                geometry = ((-(1280 / 720) / 2, centerZ), (640, height))
+            elif mouse.x >= 1 - self.SNAP_MARGIN:
+                geometry = (((1280 / 720) / 2, centerZ), (640, height))
+            else:
+                return
+            window.restoreGeometry = (window.position, window.size)
+            window.setGeometry(*geometry)
+
+        def drag_task(self, task):
+            window = self.window
+            if window is None or window.root.isEmpty():
+                self.window = None
+                return task.done
+            if not base.mouseWatcherNode.hasMouse():
+                return task.cont
+            mouse_pos = base.mouseWatcherNode.getMouse()
+            x = (mouse_pos.x - self.lastMousePos[0]) * (1280 / 720)
+            y = mouse_pos.y - self.lastMousePos[1]
+            if x == 0 and y == 0:
+                return task.cont
+            self.lastMousePos = (mouse_pos.x, mouse_pos.y)
+            if self.mode == self.MOVE:
+                window.setGeometry(
+                    position=(window.position[0] + x, window.position[1] + y)
+                )
+            elif self.mode == self.RESIZE:
+                width = max(self.MIN_SIZE[0], window.size[0] + x * 360)
+                height = max(self.MIN_SIZE[1], window.size[1] - y * 360)
+                dw = (width - window.size[0]) / 360
+                dh = (height - window.size[1]) / 360
+                window.setGeometry(
+                    position=(
+                        window.position[0] + dw / 2,
+                        window.position[1] - dh / 2,
+                    ),
+                    size=(width, height),
+                )
+            return task.cont
+
+    class Compositor:
+        def __init__(self):
+            self.enabled = False
+            self.stats = {"renders": 0, "composites": 0}
+
+        def attach(self, base: "OS"):
+            config = GLOBALMEM.get("COMPOSITOR", DEFAULTS["COMPOSITOR"])
+            self.enabled = config.get("ENABLED", False)
+
+        def _ensureBuffer(self, window: "API.Window"):
+            """
+            Creates (or recreates after a resize) the offscreen buffer, camera
+            and textured quad used to draw a window as a single card.
+            """
+            width, height = (int(window.size[0]), int(window.size[1]))
+            if window.compositeBuffer is not None:
+                if window.compositeBufferSize == (width, height):
+                    return
+                self._releaseBuffer(window)
+            xmin, xmax, ymin, ymax = window.getFrameSize()
+            tex = Texture(f"composite_{window.id}")
+            buffer = base.win.makeTextureBuffer(
+                f"composite_{window.id}", width, height, tex
+            )
+            buffer.setClearColor((0, 0, 0, 0))
+            buffer.setClearColorActive(True)
+            scene = NodePath(f"composite_scene_{window.id}")
+            scene.setDepthTest(False)
+            scene.setDepthWrite(False)
+            lens = OrthographicLens()
+            lens.setFilmSize(xmax - xmin, ymax - ymin)
+            lens.setNearFar(-1000, 1000)
+            camera = scene.attachNewNode(Camera(f"composite_cam_{window.id}", lens))
+            buffer.makeDisplayRegion().setCamera(camera)
+
+            quad = DirectFrame(
+                parent=aspect2d,  # type: ignore
+                frameColor=(0, 0, 0, 0),
+                frameSize=(xmin, xmax, ymin, ymax),
+                state=DGG.NORMAL,
+            )
+            quad.bind(DGG.B1PRESS, lambda _: API.WindowStack.focusWindow(window.id))
+            cm = CardMaker(f"composite_card_{window.id}")
+            cm.setFrame(xmin, xmax, ymin, ymax)
+            cm.setUvRange(tex)
+            card = quad.attachNewNode(cm.generate())
+            card.setTexture(tex)
+            quad.setTransparency(TransparencyAttrib.MAlpha)
+            quad.setBin("fixed", window.zSort)
+            quad.hide()
+
+            window.compositeBuffer = buffer
+            window.compositeBufferSize = (width, height)
+            window.compositeScene = scene
+            window.compositeCard = quad
+            window.dirty = True
+
+        def _releaseBuffer(self, window: "API.Window"):
+            if window.compositeBuffer is not None:
+                base.graphicsEngine.removeWindow(window.compositeBuffer)
+                window.compositeBuffer = None
+                window.compositeBufferSize = None
+            if window.compositeCard is not None:
+                window.compositeCard.destroy()
+                window.compositeCard = None
+            if window.compositeScene is not None:
+                window.compositeScene.removeNode()
+                window.compositeScene = None
+
+        def composite(self, window: "API.Window"):
+            """
+            Swaps a window's live DirectGui tree for its cached quad. The tree
+            is parked in the offscreen scene, where it is only traversed when
+            the window is dirty.
+            """
+            if (
+                not self.enabled
+                or window.composited
+                or window.winType != API.winTypes.APPLICATION
+                or window.root.isEmpty()
+            ):
+                return
+            self._ensureBuffer(window)
+            window.root.reparentTo(window.compositeScene)
+            window.root.setPos(0, 0, 0)
+            window.composited = True
+            window.compositeCard.setPos(window.position[0], 0, window.position[1])
+            window.compositeCard.show()
+            self.stats["composites"] += 1
+            if window.dirty:
+                self.render(window)
+
+        def uncomposite(self, window: "API.Window"):
+            if not window.composited:
+                return
+            window.composited = False
+            # The live tree can change in ways nothing reports (entry typing,
+            # button states), so the next composite always re-renders it.
+            window.dirty = True
+            window.compositeCard.hide()
+            if not window.root.isEmpty():
+                window.root.reparentTo(aspect2d)  # type: ignore
+                window.root.setPos(window.position[0], 0, window.position[1])
+
+        def render(self, window: "API.Window"):
+            window.dirty = False
+            window.compositeBuffer.setOneShot(True)
+            self.stats["renders"] += 1
+
+        def markDirty(self, window: "API.Window"):
+            window.dirty = True
+            FRAMEPACER.wake()
+            if window.composited:
+                self.render(window)
+
+        def release(self, window: "API.Window"):
+            window.composited = False
+            self._releaseBuffer(window)
 
     class Window:
         def __init__(
@@ -311,21 +1560,38 @@ class API:
             size: tuple = (500, 300),
             frameColor=(1, 1, 1, 1),
             winType: "API.winTypes" = None,
+            owner: "PROGRAM.Instance" = None,
         ):
             self.name = name
+            self.owner = owner
+            # Stable per-owner identity: programs create their windows in
+            # the same order every run, so name plus ordinal survives a
+            # relaunch.
+            self.key = (name, 0)
+            if owner is not None:
+                self.key = (
+                    name,
+                    sum(window.name == name for window in owner.windows),
+                )
+                owner.windows.append(self)
             self.position = position
             self.size = size
+            self.frameColor = frameColor
             self.winType = winType
-            self.lastPos = position
-            self.lastMousePos = (0, 0)
-            self.moving = False
+            self.restoreGeometry = None
+            self.destroyed = False
+            self.zPrev: "API.Window" = None
+            self.zNext: "API.Window" = None
+            self.zSort = 0
+            self.dirty = True
+            self.composited = False
+            self.compositeBuffer = None
+            self.compositeBufferSize = None
+            self.compositeScene: NodePath = None
+            self.compositeCard: DirectFrame = None
+            self.contentText: OnscreenText = None
             self.id = API.WindowStack.getId()
-            frameSize = (
-                -(1 / (1280 / 2)) * (self.size[0] / 2) * (1280 / 720),
-                (1 / (1280 / 2)) * (self.size[0] / 2) * (1280 / 720),
-                -(1 / (720 / 2)) * (self.size[1] / 2),
-                (1 / (720 / 2)) * (self.size[1] / 2),
-            )
+            frameSize = self.getFrameSize()
 
             if self.winType is None:
                 self.winType = API.winTypes.APPLICATION
@@ -362,7 +1628,7 @@ class API:
                     text_scale=1.4,
                     text_pos=(0, -0.4),
                     text_fg=(1, 1, 1, 1),
-                    text_font=VRAM["WIN11FONT"],
+                    text_font=GLYPHCACHE.fontFor("X"),
                     text_align=TextNode.ACenter,
                     pos=(frameSize[1] - 0.05, 0, frameSize[3] - 0.0365),
                     frameColor=(0.9, 0.1, 0.2, 1),
@@ -377,13 +1643,24 @@ class API:
                     text_scale=0.05,
                     text_pos=(0, 0),
                     text_fg=(0, 0, 0, 1),
-                    text_font=VRAM["WIN11FONT"],
+                    text_font=GLYPHCACHE.fontFor(name),
                     text_align=TextNode.ALeft,
                     pos=(frameSize[0] + 0.1, 0, frameSize[3] - 0.038),
                     frameColor=(0.5, 0.5, 0.5, 0),
                     relief=DGG.FLAT,
                 )
-                taskMgr.add(self.move_task, "move_task")  # type: ignore
+
+                self.resizeGrip = DirectButton(
+                    parent=self.root,
+                    frameColor=(0.5, 0.5, 0.5, 0.5),
+                    frameSize=(-0.03, 0, 0, 0.03),
+                    pos=(frameSize[1], 0, frameSize[2]),
+                    relief=DGG.FLAT,
+                    geom=None,
+                    text="",
+                )
+                self.resizeGrip.bind(DGG.B1PRESS, lambda _: self.startResize())
+                self.resizeGrip.bind(DGG.B1RELEASE, lambda _: self.stopMove())
             elif self.winType == API.winTypes.SYSTEM:
                 self.root = DirectFrame(
                     parent=aspect2d,  # type: ignore
@@ -393,42 +1670,244 @@ class API:
                     relief=DGG.RIDGE,
                 )
 
+            self.root.bind(DGG.B1PRESS, lambda _: API.WindowStack.routeClick())
             API.WindowStack.addWindow(window=self, name=self.id)
 
-        def startMove(self):
-            self.moving = True
-            self.lastMousePos = (
-                base.mouseWatcherNode.getMouse().x,
-                base.mouseWatcherNode.getMouse().y,
+        def getFrameSize(self):
+            return (
+                -(1 / (1280 / 2)) * (self.size[0] / 2) * (1280 / 720),
+                (1 / (1280 / 2)) * (self.size[0] / 2) * (1280 / 720),
+                -(1 / (720 / 2)) * (self.size[1] / 2),
+                (1 / (720 / 2)) * (self.size[1] / 2),
             )
-            API.WindowStack.focusWindow(self.id)
+
+        def setGeometry(self, position: tuple = None, size: tuple = None):
+            if size is not None and size != self.size:
+                API.Compositor.uncomposite(self)
+            if position is not None:
+                self.position = position
+                if self.composited:
+                    self.compositeCard.setPos(position[0], 0, position[1])
+                else:
+                    self.root.setPos(position[0], 0, position[1])
+            if size is not None and size != self.size:
+                self.size = size
+                self.dirty = True
+                frameSize = self.getFrameSize()
+                self.root["frameSize"] = frameSize
+                if self.winType == API.winTypes.APPLICATION:
+                    self.topBar["frameSize"] = (
+                        frameSize[0],
+                        frameSize[1],
+                        frameSize[3] - 0.075,
+                        frameSize[3],
+                    )
+                    self.topBarCloseButton.setPos(
+                        frameSize[1] - 0.05, 0, frameSize[3] - 0.0365
+                    )
+                    self.topBarNameText.setPos(
+                        frameSize[0] + 0.1, 0, frameSize[3] - 0.038
+                    )
+                    self.resizeGrip.setPos(frameSize[1], 0, frameSize[2])
+
+        def setText(self, text: str):
+            if self.contentText is None:
+                frameSize = self.getFrameSize()
+                self.contentText = OnscreenText(
+                    text=text,
+                    fg=(1, 1, 1, 1),
+                    font=VRAM["WIN11FONT"],
+                    pos=(frameSize[0] + 0.03, frameSize[3] - 0.13),
+                    scale=0.04,
+                    align=TextNode.ALeft,
+                    mayChange=True,
+                    parent=self.root,
+                )
+            else:
+                self.contentText.setText(text)
+            self.markDirty()
+
+        def startMove(self):
+            API.WindowController.begin(self, API.WindowController.MOVE)
+
+        def startResize(self):
+            API.WindowController.begin(self, API.WindowController.RESIZE)
 
         def stopMove(self):
-            self.moving = False
+            API.WindowController.end()
+
+        def markDirty(self):
+            API.Compositor.markDirty(self)
 
         def defocusCommand(self):
             if self.winType == API.winTypes.SYSTEM:
                 self.destroy()
 
-        def move_task(self, task):
-            if base.mouseWatcherNode.hasMouse() and self.moving:
-                mouse_pos = base.mouseWatcherNode.getMouse()
-                x = mouse_pos.x - self.lastMousePos[0]
-                y = mouse_pos.y - self.lastMousePos[1]
-                self.root.setPos(self.root.getPos() + Vec3(x * (1280 / 720), 0, y))
-                self.lastMousePos = (
-                    mouse_pos.x,
-                    mouse_pos.y,
-                )
-            return task.cont
-
         def destroy(self):
+            if self.destroyed:
+                return
+            self.destroyed = True
+            API.WindowController.release(self)
+            API.Compositor.release(self)
             API.WindowStack.removeWindow(self.id)
-            self.root.removeNode()
+            if not self.root.isEmpty():
+                self.root.destroy()
+            if self.owner is not None:
+                owner, self.owner = self.owner, None
+                owner.windowClosed(self)
+
+    class TextSurface:
+        """
+        Scrolling text area for a window. Lines live in a fixed-capacity ring
+        buffer; only the visible rows exist as TextNodes and they are reused
+        as the view scrolls. write() only queues text, and the queue is
+        folded into the buffer once per frame.
+        """
+
+        def __init__(
+            self,
+            window: "API.Window",
+            frame: tuple,
+            scale=0.04,
+            fg=(1, 1, 1, 1),
+            capacity: int = None,
+        ):
+            config = GLOBALMEM.get("TERMINAL", DEFAULTS["TERMINAL"])
+            self.window = window
+            self.lines = deque(maxlen=capacity or config.get("SCROLLBACK", 10000))
+            self.pending: list[str] = []
+            self.pendingNewlines = 0
+            self.partial = ""
+            self.totalLines = 0
+            self.offset = 0
+            self.dirty = True
+            self.stats = {"updates": 0, "rowUpdates": 0, "discarded": 0}
+
+            left, right, bottom, top = frame
+            font = VRAM["WIN11FONT"]
+            lineHeight = scale * font.getLineHeight()
+            self.rowCount = max(1, int((top - bottom) / lineHeight))
+            self.columns = max(1, int((right - left) / (scale * 0.5)))
+            self.rows: list[NodePath] = []
+            self.rowText: list[str] = []
+            for index in range(self.rowCount):
+                node = TextNode(f"{window.name}_row{index}")
+                node.setFont(font)
+                node.setTextColor(fg)
+                node.setAlign(TextNode.ALeft)
+                row = window.root.attachNewNode(node)
+                row.setScale(scale)
+                row.setPos(left, 0, top - (index + 1) * lineHeight)
+                self.rows.append(row)
+                self.rowText.append("")
+            self.task = TaskManager.addTask(
+                self.update,
+                priority=TaskManager.priorities.NORMAL,
+                name=f"TextSurface.update:{window.name}",
+                wakes=False,
+            )
+
+        def write(self, text):
+            text = str(text)
+            self.pending.append(text)
+            self.pendingNewlines += text.count("\n")
+            self.dirty = True
+
+        def clear(self):
+            self.pending.clear()
+            self.pendingNewlines = 0
+            self.lines.clear()
+            self.partial = ""
+            self.offset = 0
+            self.dirty = True
+
+        def scroll(self, lines):
+            """
+            Moves the view by lines (positive scrolls back into history).
+            """
+            limit = max(0, len(self.lines) + bool(self.partial) - self.rowCount)
+            self.offset = max(0, min(limit, self.offset + lines))
+            self.dirty = True
+
+        def tail(self, count):
+            lines = list(self.lines)[-count:]
+            return lines + [self.partial] if self.partial else lines
+
+        def _drain(self):
+            if not self.pending:
+                return
+            # Only the newest chunks that can still be on screen or in the
+            # ring are split; older ones are just counted.
+            needed = self.lines.maxlen + 1
+            keep = newlines = 0
+            for chunk in reversed(self.pending):
+                keep += 1
+                newlines += chunk.count("\n")
+                if newlines >= needed:
+                    break
+            if keep < len(self.pending):
+                skipped = self.pendingNewlines - newlines
+                self.totalLines += skipped
+                self.stats["discarded"] += skipped
+                self.partial = ""
+                del self.pending[:-keep]
+            text = self.partial + "".join(self.pending)
+            self.pending.clear()
+            self.pendingNewlines = 0
+            lines = text.split("\n")
+            self.partial = lines.pop()
+            self.totalLines += len(lines)
+            if self.offset > 0:
+                # Keep a scrolled-back view on the same lines.
+                self.offset = min(self.offset + len(lines), self.lines.maxlen)
+            # Lines that would be pushed out of the ring in this same frame
+            # are never stored.
+            overflow = len(lines) - self.lines.maxlen
+            if overflow > 0:
+                self.stats["discarded"] += overflow
+                lines = lines[overflow:]
+            self.lines.extend(lines)
+
+        def update(self):
+            if self.window.root.isEmpty():
+                self.task = None
+                return TaskManager.DONE
+            if not self.dirty:
+                return
+            self.dirty = False
+            self._drain()
+            total = len(self.lines) + bool(self.partial)
+            end = total - self.offset
+            start = max(0, end - self.rowCount)
+            for index in range(self.rowCount):
+                lineIndex = start + index
+                if lineIndex >= end:
+                    text = ""
+                elif lineIndex == len(self.lines):
+                    text = self.partial
+                else:
+                    text = self.lines[lineIndex]
+                text = text[: self.columns]
+                if text != self.rowText[index]:
+                    self.rowText[index] = text
+                    self.rows[index].node().setText(text)
+                    self.stats["rowUpdates"] += 1
+            self.stats["updates"] += 1
+            self.window.markDirty()
+
+        def destroy(self):
+            if self.task is not None:
+                TaskManager.removeTask(self.task)
+                self.task = None
+            for row in self.rows:
+                row.removeNode()
+            self.rows.clear()
 
 
 API = API()
 API.WindowStack = API.WindowStack()
+API.WindowController = API.WindowController()
+API.Compositor = API.Compositor()
 
 
 class _state:
@@ -445,28 +1924,223 @@ _state = _state()
 
 
 class FILEMGR:
+    SNAPSHOT = "./HYBERFIL"
+    JOURNAL = "./HYBERFIL.journal"
+    SAVE_TIMEOUT = 10
+
     def __init__(self):
         self.keyStore = {"readmode": "r", "writemode": "w"}
+        self.writes = queue.SimpleQueue()
+        self.writer: threading.Thread = None
+        self.flushTask = None
+        self.journalBytes = 0
+        self.compactBytes = DEFAULTS["PERSISTENCE"]["COMPACT_BYTES"]
+        # The writer thread's own copy of the store, rebuilt from journal
+        # records, so compaction never touches GLOBALMEM off the render thread.
+        self.mirror: dict = {}
+        # Set when an append may have left a partial record in the journal;
+        # the next write compacts instead of appending after it.
+        self.journalDamaged = False
+        self.stats = {"records": 0, "flushes": 0, "compactions": 0, "errors": 0}
+
+    @staticmethod
+    def encodeRecord(key, value, deleted=False):
+        body = dumps({"k": key, "d": True} if deleted else {"k": key, "v": value})
+        return f"{zlib.crc32(body.encode()):08x} {body}\n"
+
+    @staticmethod
+    def decodeRecord(line):
+        crc, _, body = line.rstrip("\n").partition(" ")
+        if not body or int(crc, 16) != zlib.crc32(body.encode()):
+            raise ValueError("torn journal record")
+        return loads(body)
 
     def loadPrefs(self):
-        with open("./HYBERFIL", self.keyStore["readmode"]) as f:
-            global GLOBALMEM
+        """
+        Loads the last compacted snapshot, then replays the journal on top of
+        it. Replay stops at the first torn record, which can only be the tail
+        of a write interrupted by a hard kill.
+        """
+        dict.clear(GLOBALMEM)
+        try:
+            with open(self.SNAPSHOT, self.keyStore["readmode"]) as f:
+                dict.update(GLOBALMEM, loads(f.read()))
+        except FileNotFoundError:
+            dict.update(GLOBALMEM, loads(dumps(DEFAULTS)))
+        except Exception as e:
+            print("Error loading RAM disk: ", e)
+            if os.path.exists(self.SNAPSHOT):
+                os.replace(self.SNAPSHOT, self.SNAPSHOT + ".corrupt")
+                print(f"Kept the unreadable snapshot as {self.SNAPSHOT}.corrupt")
+            dict.update(GLOBALMEM, loads(dumps(DEFAULTS)))
+
+        replayed = 0
+        try:
+            with open(self.JOURNAL, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        offset = 0
+        for line in data.splitlines(keepends=True):
             try:
-                _f: dict = loads(f.read())
-                for d, v in _f.items():
-                    GLOBALMEM[d] = v
-            except Exception as e:
-                print("Error loading RAM disk: ", e)
-                GLOBALMEM.clear()
-                GLOBALMEM = DEFAULTS
+                if not line.endswith(b"\n"):
+                    raise ValueError("torn journal record")
+                record = self.decodeRecord(line.decode("utf-8"))
+            except ValueError:
+                print("Discarded a torn journal record")
+                with open(self.JOURNAL, "r+b") as f:
+                    f.truncate(offset)
+                break
+            if record.get("d"):
+                dict.pop(GLOBALMEM, record["k"], None)
+            else:
+                dict.__setitem__(GLOBALMEM, record["k"], record["v"])
+            offset += len(line)
+            replayed += 1
+        self.journalBytes = offset
+        GLOBALMEM.dirty.clear()
+        self.mirror = loads(dumps(GLOBALMEM))
+        config = GLOBALMEM.get("PERSISTENCE", DEFAULTS["PERSISTENCE"])
+        self.compactBytes = config.get("COMPACT_BYTES", 65536)
+        self.start(config.get("FLUSH_RATE", 4))
+        print(f"Loaded RAM disk ({replayed} journal records replayed)")
+
+    def start(self, flushRate):
+        if self.writer is not None:
+            return
+        self.writer = threading.Thread(
+            target=self.write_loop, name="FILEMGR", daemon=True
+        )
+        self.writer.start()
+        self.flushTask = TaskManager.addTask(
+            self.flush,
+            priority=TaskManager.priorities.LOW,
+            rate=flushRate,
+            name="FILEMGR.flush",
+            wakes=False,
+        )
+
+    def flush(self):
+        """
+        Serializes the dirty keys into journal records and hands them to the
+        writer thread. Runs at PERSISTENCE.FLUSH_RATE, which debounces bursts
+        of changes to the same key into a single record.
+        """
+        if not GLOBALMEM.dirty:
+            return
+        dirty, GLOBALMEM.dirty = GLOBALMEM.dirty, set()
+        SEARCH.indexSettings(dirty)
+        records = []
+        for key in dirty:
+            if key in GLOBALMEM:
+                records.append(self.encodeRecord(key, GLOBALMEM[key]))
+            else:
+                records.append(self.encodeRecord(key, None, deleted=True))
+        self.writes.put(("append", records))
 
-        print("Loaded RAM disk")
+    def write_loop(self):
+        """
+        Never dies on a write error: the error is reported, and a compact
+        request always gets an answer (None or the exception).
+        """
+        while True:
+            op, payload = self.writes.get()
+            if op == "stop":
+                return
+            error = None
+            try:
+                if op == "append":
+                    self._append(payload)
+                elif op == "compact":
+                    self._compact()
+            except Exception as e:
+                error = e
+                self.stats["errors"] += 1
+                print("Error writing RAM disk: ", e)
+            if op == "compact":
+                payload.put(error)
+
+    def _append(self, records):
+        # The mirror is updated first so that a failed append is still
+        # covered by the next compaction.
+        for line in records:
+            record = self.decodeRecord(line)
+            if record.get("d"):
+                self.mirror.pop(record["k"], None)
+            else:
+                self.mirror[record["k"]] = record["v"]
+        if self.journalDamaged:
+            self._compact()
+            return
+        data = "".join(records).encode("utf-8")
+        self.journalDamaged = True
+        with open(self.JOURNAL, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.journalDamaged = False
+        self.journalBytes += len(data)
+        self.stats["records"] += len(records)
+        self.stats["flushes"] += 1
+        if self.journalBytes >= self.compactBytes:
+            self._compact()
+
+    def _compact(self):
+        """
+        Replaces the snapshot with the mirror (temp file, fsync, rename) and
+        then truncates the journal. A crash in between only means the journal
+        is replayed over a snapshot that already contains it.
+        """
+        temp = self.SNAPSHOT + ".tmp"
+        with open(temp, self.keyStore["writemode"]) as f:
+            dump(self.mirror, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.SNAPSHOT)
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(os.path.dirname(os.path.abspath(self.SNAPSHOT)), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        with open(self.JOURNAL, "wb") as f:
+            os.fsync(f.fileno())
+        self.journalBytes = 0
+        self.journalDamaged = False
+        self.stats["compactions"] += 1
 
     def savePrefs(self):
-        with open("./HYBERFIL", self.keyStore["writemode"]) as f:
-            dump(GLOBALMEM, f, indent=4)
+        """
+        Flushes pending changes and compacts the journal, blocking until the
+        snapshot is on disk. If the writer thread fails to compact, the
+        snapshot is written from GLOBALMEM on this thread instead; errors
+        from that are raised.
+        """
+        self.flush()
+        if self.writer is not None and self.writer.is_alive():
+            done = queue.SimpleQueue()
+            self.writes.put(("compact", done))
+            try:
+                error = done.get(timeout=self.SAVE_TIMEOUT)
+            except queue.Empty:
+                raise TimeoutError("RAM disk writer did not respond")
+            if error is None:
+                print("Saved RAM disk")
+                return
+        self.mirror = loads(dumps(GLOBALMEM))
+        self._compact()
         print("Saved RAM disk")
 
+    def shutdown(self):
+        try:
+            self.savePrefs()
+        except Exception as e:
+            print("Error saving RAM disk: ", e)
+        if self.writer is not None:
+            self.writes.put(("stop", None))
+            self.writer.join(self.SAVE_TIMEOUT)
+            self.writer = None
+
     def getKey(self, key):
         return self.keyStore.get(key, None)
 
@@ -477,68 +2151,1430 @@ class FILEMGR:
 FILEMGR = FILEMGR()
 
 
-class AUTH:
-    def login(self, username, password):
-        return self.verify(username, password)
+class VFS:
+    """
+    Simulated disk kept in a single container file. The directory index
+    lives in memory and is written as one marshal blob per commit; file
+    contents are stored in block-aligned extents and read through mmap.
+    Commits are written and fsynced by a writer thread, one at a time.
 
-    def verify(self, username, password) -> _state:
-        if username in GLOBALMEM["AUTH"]["users"]:
-            if GLOBALMEM["AUTH"]["users"][username] == password:
-                return _state.PASS
-            else:
-                return _state.VAL_INVALID
-        elif len(username) == 0:
-            return _state.ERR
-        elif len(GLOBALMEM["AUTH"]["users"]) == 0:
-            return _state.PASS
-        else:
-            return _state.MEM_INVALID
+    Layout: two superblock slots of one block each (the valid one with the
+    highest generation wins), then block-aligned extents for file data and
+    the index.
+    """
 
+    BLOCK = 512
+    DATA_START = 1024
+    MAGIC = b"VFS1"
+    VERSION = 1
+    SUPERBLOCK = struct.Struct("<4sHIQQQQ")
+    SLOTS = (0, 512)
 
-AUTH = AUTH()
+    class Node:
+        __slots__ = ("isDir", "size", "mtime", "extents")
 
+        def __init__(self, isDir, size=0, mtime=0.0, extents=()):
+            self.isDir = isDir
+            self.size = size
+            self.mtime = mtime
+            self.extents = list(extents)
 
-class PROGRAM:
-    def __init__(self, path):
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"File not found: {path}")
-        os.chdir(path)
-        jsonFile = open("index.json", "r")
-        self.data = loads(jsonFile.read())
-        jsonFile.close()
-        self.name = self.data["name"]
-        self.execPath = os.path.abspath(self.data["execPath"])
-        self.image = VRAM["LOADER"].loadTexture(
-            "/"
-            + os.path.abspath(self.data["iconPath"]).replace("\\", "/").replace(":", "")
+    def __init__(self):
+        self.path = None
+        self.file = None
+        self.map: mmap.mmap = None
+        self.nodes: dict[str, VFS.Node] = {}
+        # Index records kept up to date per node, so a commit snapshots the
+        # index without walking every node.
+        self.records: dict[str, tuple] = {}
+        self.children: dict[str, set] = {}
+        self.listings: dict[str, list] = {}
+        self.pending: dict[str, bytes] = {}
+        self.inflight: dict[str, bytes] = {}
+        self.released: list[tuple] = []
+        self.free: list[list] = []
+        self.dataEnd = VFS.DATA_START
+        self.generation = 0
+        self.indexExtent = None
+        self.dirty = False
+        self.committing = False
+        self.commitTask = None
+        self.writes = queue.SimpleQueue()
+        self.completed = queue.SimpleQueue()
+        self.writer: threading.Thread = None
+        self.stats = {
+            "reads": 0,
+            "writes": 0,
+            "commits": 0,
+            "bytesWritten": 0,
+            "errors": 0,
+        }
+
+    @staticmethod
+    def normpath(path):
+        path = posixpath.normpath("/" + str(path).replace("\\", "/").lstrip("/"))
+        return "/" if path == "//" else path
+
+    @staticmethod
+    def join(cwd, path):
+        return VFS.normpath(posixpath.join(cwd, str(path).replace("\\", "/")))
+
+    def mount(self):
+        config = GLOBALMEM.get("VFS", DEFAULTS["VFS"])
+        self.path = config.get("PATH", DEFAULTS["VFS"]["PATH"])
+        self.writer = threading.Thread(target=self.write_loop, name="VFS", daemon=True)
+        self.writer.start()
+        if os.path.exists(self.path):
+            self.file = open(self.path, "r+b")
+            try:
+                self._load()
+            except Exception as e:
+                print("Error mounting virtual disk: ", e)
+                self.file.close()
+                os.replace(self.path, self.path + ".corrupt")
+                print(f"Kept the unreadable disk as {self.path}.corrupt")
+                self.file = None
+        if self.file is None:
+            self.file = open(self.path, "w+b")
+            self._format()
+        self._remap()
+        self.commitTask = TaskManager.addTask(
+            self.commit,
+            priority=TaskManager.priorities.LOW,
+            rate=config.get("COMMIT_RATE", 1),
+            name="VFS.commit",
+            wakes=False,
         )
-        self.hover_text = self.data["hover_text"]
-        self.description = self.data["description"]
-        self.programData = self.data["programData"]
-        os.chdir("..")
-
-    def run(self):
-        with open(self.execPath, "r") as fp:
-            programData = fp.read()
-
-        INJECTOR = """"""
-        programData = INJECTOR + programData
-        exec(programData, globals())
+        print(f"Mounted virtual disk ({len(self.nodes)} entries)")
+
+    def unmount(self):
+        if self.file is None:
+            return
+        self.sync()
+        if self.commitTask is not None:
+            TaskManager.removeTask(self.commitTask)
+            self.commitTask = None
+        self.writes.put(("stop", None))
+        self.writer.join()
+        self.writer = None
+        self.map.close()
+        self.map = None
+        self.file.close()
+        self.file = None
+
+    def _readSuperblock(self):
+        best = None
+        for slot in VFS.SLOTS:
+            self.file.seek(slot)
+            raw = self.file.read(VFS.SUPERBLOCK.size + 4)
+            if len(raw) < VFS.SUPERBLOCK.size + 4:
+                continue
+            body, (crc,) = raw[:-4], struct.unpack("<I", raw[-4:])
+            if zlib.crc32(body) != crc:
+                continue
+            fields = VFS.SUPERBLOCK.unpack(body)
+            if fields[0] != VFS.MAGIC or fields[1] != VFS.VERSION:
+                continue
+            if best is None or fields[3] > best[3]:
+                best = fields
+        if best is None:
+            raise ValueError("no valid superblock")
+        return best
+
+    def _writeSuperblock(self, generation, indexExtent):
+        body = VFS.SUPERBLOCK.pack(
+            VFS.MAGIC,
+            VFS.VERSION,
+            VFS.BLOCK,
+            generation,
+            indexExtent[0],
+            indexExtent[1],
+            self.dataEnd,
+        )
+        self.file.seek(VFS.SLOTS[generation % len(VFS.SLOTS)])
+        self.file.write(body + struct.pack("<I", zlib.crc32(body)))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def _load(self):
+        _, _, _, self.generation, indexOffset, indexLength, self.dataEnd = (
+            self._readSuperblock()
+        )
+        self.file.seek(indexOffset)
+        records = marshal.loads(self.file.read(indexLength))
+        self.indexExtent = (indexOffset, indexLength)
+        self.nodes.clear()
+        self.records.clear()
+        self.children.clear()
+        self.listings.clear()
+        used = [self.indexExtent]
+        for path, isDir, size, mtime, extents in records:
+            self._link(path, VFS.Node(isDir, size, mtime, extents))
+            used.extend(extents)
+        # Every block between the superblocks and dataEnd that no live extent
+        # covers is free.
+        self.free = []
+        cursor = VFS.DATA_START
+        for offset, length in sorted(used):
+            if offset > cursor:
+                self.free.append([cursor, offset - cursor])
+            cursor = max(cursor, offset + self._blocks(length))
+        if cursor < self.dataEnd:
+            self.free.append([cursor, self.dataEnd - cursor])
+
+    def _format(self):
+        self.file.truncate(0)
+        self.file.write(b"\0" * VFS.DATA_START)
+        self.nodes.clear()
+        self.records.clear()
+        self.children.clear()
+        self.listings.clear()
+        self.free = []
+        self.dataEnd = VFS.DATA_START
+        self.generation = 0
+        self._link("/", VFS.Node(True))
+        for user in GLOBALMEM.get("AUTH", DEFAULTS["AUTH"])["users"]:
+            for folder in ["Desktop", "Documents", "Downloads"]:
+                self.mkdir(f"/Users/{user}/{folder}")
+        self.mkdir("/Windows/System32")
+        self.importTree("./src/prgm", "/Program Files")
+        self.dirty = True
+        self.sync()
+
+    def importTree(self, hostPath, path):
+        """
+        Copies a host directory into the disk. Only used when formatting.
+        """
+        for dirPath, dirNames, fileNames in os.walk(hostPath):
+            dirNames[:] = sorted(d for d in dirNames if not d.startswith("."))
+            target = self.join(path, os.path.relpath(dirPath, hostPath))
+            self.mkdir(target)
+            for fileName in sorted(f for f in fileNames if not f.startswith(".")):
+                with open(os.path.join(dirPath, fileName), "rb") as f:
+                    self.write(self.join(target, fileName), f.read())
+
+    def _remap(self):
+        # read() only hands out copies, so the previous map can be closed.
+        if self.map is not None:
+            self.map.close()
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _blocks(length):
+        return -(-length // VFS.BLOCK) * VFS.BLOCK
+
+    def _allocate(self, length):
+        length = self._blocks(length)
+        for extent in self.free:
+            if extent[1] >= length:
+                offset = extent[0]
+                extent[0] += length
+                extent[1] -= length
+                if extent[1] == 0:
+                    self.free.remove(extent)
+                return offset
+        offset = self.dataEnd
+        self.dataEnd += length
+        return offset
+
+    def _release(self, extent):
+        offset, length = extent[0], self._blocks(extent[1])
+        if length == 0:
+            return
+        self.free.append([offset, length])
+        self.free.sort()
+        merged = [self.free[0]]
+        for extent in self.free[1:]:
+            if merged[-1][0] + merged[-1][1] == extent[0]:
+                merged[-1][1] += extent[1]
+            else:
+                merged.append(extent)
+        self.free = merged
+
+    def _record(self, path, node: "VFS.Node"):
+        self.records[path] = (path, node.isDir, node.size, node.mtime, node.extents)
+
+    def _link(self, path, node: "VFS.Node"):
+        self.nodes[path] = node
+        self._record(path, node)
+        if node.isDir:
+            self.children.setdefault(path, set())
+        if path != "/":
+            parent, name = posixpath.split(path)
+            self.children[parent].add(name)
+            self.listings.pop(parent, None)
+
+    def _unlink(self, path):
+        node = self.nodes.pop(path)
+        del self.records[path]
+        self.children.pop(path, None)
+        self.listings.pop(path, None)
+        parent, name = posixpath.split(path)
+        self.children[parent].discard(name)
+        self.listings.pop(parent, None)
+        return node
+
+    def exists(self, path):
+        return self.normpath(path) in self.nodes
+
+    def isdir(self, path):
+        node = self.nodes.get(self.normpath(path))
+        return node is not None and node.isDir
+
+    def stat(self, path) -> "VFS.Node":
+        node = self.nodes.get(self.normpath(path))
+        if node is None:
+            raise FileNotFoundError(path)
+        return node
+
+    def listdir(self, path, start=0, count=None):
+        """
+        Sorted entry names of a directory, answered from the in-memory index.
+        The sorted listing is cached until the directory changes, so paging
+        through a large directory with start/count is a slice.
+        """
+        path = self.normpath(path)
+        if not self.isdir(path):
+            raise NotADirectoryError(path)
+        listing = self.listings.get(path)
+        if listing is None:
+            listing = self.listings[path] = sorted(self.children[path])
+        return listing[start:] if count is None else listing[start : start + count]
+
+    def count(self, path):
+        return len(self.children.get(self.normpath(path), ()))
+
+    def mkdir(self, path):
+        path = self.normpath(path)
+        node = self.nodes.get(path)
+        if node is not None:
+            if not node.isDir:
+                raise FileExistsError(path)
+            return
+        self.mkdir(posixpath.dirname(path))
+        self._link(path, VFS.Node(True, mtime=time.time()))
+        self.dirty = True
+
+    def read(self, path) -> bytes:
+        """
+        File contents, copied out of the mapped container (or taken from a
+        write that is not on disk yet). Extents are reused once a later
+        commit frees them, so no view into the map is ever handed out.
+        """
+        path = self.normpath(path)
+        node = self.stat(path)
+        if node.isDir:
+            raise IsADirectoryError(path)
+        self.stats["reads"] += 1
+        if path in self.pending:
+            return self.pending[path]
+        if path in self.inflight:
+            return self.inflight[path]
+        return b"".join(
+            self.map[offset : offset + length] for offset, length in node.extents
+        )
+
+    def readText(self, path, encoding="utf-8"):
+        return self.read(path).decode(encoding, errors="replace")
+
+    def write(self, path, data):
+        """
+        Replaces a file's contents. The data is held in memory and written
+        with everything else pending on the next commit.
+        """
+        path = self.normpath(path)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        node = self.nodes.get(path)
+        if node is not None and node.isDir:
+            raise IsADirectoryError(path)
+        self.mkdir(posixpath.dirname(path))
+        if node is None:
+            node = VFS.Node(False)
+            self._link(path, node)
+        self.released.extend(node.extents)
+        node.extents = []
+        node.size = len(data)
+        node.mtime = time.time()
+        self._record(path, node)
+        self.pending[path] = bytes(data)
+        self.stats["writes"] += 1
+        self.dirty = True
+
+    def remove(self, path, recursive=False):
+        path = self.normpath(path)
+        if path == "/":
+            raise PermissionError(path)
+        node = self.stat(path)
+        if node.isDir:
+            names = list(self.children[path])
+            if names and not recursive:
+                raise OSError(f"Directory not empty: {path}")
+            for name in names:
+                self.remove(self.join(path, name), recursive=True)
+        self._unlink(path)
+        self.released.extend(node.extents)
+        self.pending.pop(path, None)
+        self.dirty = True
+
+    def commit(self):
+        """
+        Hands every pending file and a snapshot of the index to the writer
+        thread. Runs at VFS.COMMIT_RATE; only one commit is in flight at a
+        time, and until it completes the writer owns the allocator (free
+        list and dataEnd) and the container file.
+        """
+        self.collect()
+        if self.committing or not self.dirty or self.file is None:
+            return
+        writes = []
+        for path, data in self.pending.items():
+            node = self.nodes.get(path)
+            if node is None or not data:
+                continue
+            node.extents = [(self._allocate(len(data)), len(data))]
+            self._record(path, node)
+            writes.append((node.extents[0][0], data))
+        self.inflight, self.pending = self.pending, {}
+        released, self.released = self.released, []
+        self.dirty = False
+        self.committing = True
+        self.writes.put(("commit", (writes, list(self.records.values()), released)))
+
+    def collect(self, block=False):
+        """
+        Finishes the commit in flight once the writer reports it: extents
+        freed by it become reusable and the map is grown to the new file
+        size. A failed commit is queued again.
+        """
+        if not self.committing:
+            return
+        try:
+            result, payload = self.completed.get(block)
+        except queue.Empty:
+            return
+        self.committing = False
+        if result == "error":
+            error, released = payload
+            print("Error committing virtual disk: ", error)
+            self.stats["errors"] += 1
+            self.inflight.update(self.pending)
+            self.pending, self.inflight = self.inflight, {}
+            self.released.extend(released)
+            self.dirty = True
+            return
+        for extent in payload:
+            self._release(extent)
+        self.inflight = {}
+        self.stats["commits"] += 1
+        self._remap()
+
+    def sync(self):
+        """
+        Blocks until every change made so far is on disk.
+        """
+        self.collect(block=True)
+        self.commit()
+        self.collect(block=True)
+
+    def write_loop(self):
+        while True:
+            op, payload = self.writes.get()
+            if op == "stop":
+                return
+            writes, records, released = payload
+            try:
+                freed = self._write(writes, records)
+            except Exception as e:
+                self.completed.put(("error", (e, released)))
+            else:
+                self.completed.put(("done", released + freed))
+
+    def _write(self, writes, records):
+        """
+        Writes the data and a fresh index in offset order, fsyncs, then
+        flips the superblock. Returns the previous index extent, which is
+        only reused after the new superblock is on disk.
+        """
+        index = marshal.dumps(records)
+        indexExtent = (self._allocate(len(index)), len(index))
+        writes = sorted(writes + [(indexExtent[0], index)], key=lambda w: w[0])
+        for offset, data in writes:
+            self.file.seek(offset)
+            self.file.write(data)
+            self.stats["bytesWritten"] += len(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        self._writeSuperblock(self.generation + 1, indexExtent)
+        previous = self.indexExtent
+        self.indexExtent = indexExtent
+        self.generation += 1
+        return [previous] if previous else []
+
+
+VFS = VFS()
+API.VFS = VFS
+
+
+class AUTH:
+    def login(self, username, password):
+        return self.verify(username, password)
+
+    def verify(self, username, password) -> _state:
+        if username in GLOBALMEM["AUTH"]["users"]:
+            if GLOBALMEM["AUTH"]["users"][username] == password:
+                return _state.PASS
+            else:
+                return _state.VAL_INVALID
+        elif len(username) == 0:
+            return _state.ERR
+        elif len(GLOBALMEM["AUTH"]["users"]) == 0:
+            return _state.PASS
+        else:
+            return _state.MEM_INVALID
+
+
+AUTH = AUTH()
+
+
+class CODECACHE:
+    MAGIC = importlib.util.MAGIC_NUMBER + b"W11C"
+    HEADER = struct.Struct("<qq20s20s")
+
+    def __init__(self):
+        self.memory: dict[str, tuple] = {}
+        self.stats = {"hits": 0, "diskHits": 0, "misses": 0}
+
+    def cachePath(self, path):
+        directory, filename = os.path.split(path)
+        return os.path.join(directory, "__pycache__", filename + ".wincache")
+
+    def load(self, path, prefix=""):
+        """
+        Returns the code object for a program source file, compiling it only
+        when neither the in-memory nor the on-disk cache is valid.
+        :param prefix: Source prepended before compiling (the program injector).
+        """
+        stat = os.stat(path)
+        prefixDigest = hashlib.sha1(prefix.encode()).digest()
+        key = (stat.st_mtime_ns, stat.st_size, prefixDigest)
+        cached = self.memory.get(path)
+        if cached is not None and cached[0] == key:
+            self.stats["hits"] += 1
+            return cached[1]
+
+        header, body = self._readCache(path)
+        if header is not None and (header[0], header[1], header[3]) == key:
+            code = marshal.loads(body)
+            self.stats["diskHits"] += 1
+        else:
+            with open(path, "r") as fp:
+                source = prefix + fp.read()
+            digest = hashlib.sha1(source.encode()).digest()
+            if header is not None and header[2] == digest:
+                code = marshal.loads(body)
+                self.stats["diskHits"] += 1
+            else:
+                code = compile(source, path, "exec")
+                self.stats["misses"] += 1
+            self._writeCache(path, key, digest, code)
+        self.memory[path] = (key, code)
+        return code
+
+    def _readCache(self, path):
+        try:
+            with open(self.cachePath(path), "rb") as fp:
+                data = fp.read()
+        except OSError:
+            return None, None
+        if not data.startswith(self.MAGIC):
+            return None, None
+        offset = len(self.MAGIC)
+        try:
+            header = self.HEADER.unpack_from(data, offset)
+        except struct.error:
+            return None, None
+        return header, data[offset + self.HEADER.size :]
+
+    def _writeCache(self, path, key, digest, code):
+        cachePath = self.cachePath(path)
+        try:
+            os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+            tmpPath = cachePath + ".tmp"
+            with open(tmpPath, "wb") as fp:
+                fp.write(self.MAGIC)
+                fp.write(self.HEADER.pack(key[0], key[1], digest, key[2]))
+                fp.write(marshal.dumps(code))
+            os.replace(tmpPath, cachePath)
+        except OSError as e:
+            print("Could not write code cache: ", e)
+
+
+CODECACHE = CODECACHE()
+
+
+class WORKERPOOL:
+    HEADER = struct.Struct("<I")
+    MAX_OPS_PER_FRAME = 512
+    STOP_TIMEOUT = 2.0
+
+    class Worker:
+        def __init__(self):
+            self.process = subprocess.Popen(
+                [sys.executable, "-u", WORKERPOOL.hostPath],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+            self.inbox = queue.SimpleQueue()
+            self.instance: "PROGRAM.Instance" = None
+            self.windows: dict[int, API.Window] = {}
+            # True between "run" and the worker's "done"; a released worker
+            # that is still running has been sent "stop" and is waited for
+            # until stopDeadline.
+            self.running = False
+            self.stopDeadline = None
+            self.reader = threading.Thread(target=self.read_loop, daemon=True)
+            self.reader.start()
+
+        def read_loop(self):
+            stream = self.process.stdout
+            while True:
+                header = stream.read(WORKERPOOL.HEADER.size)
+                if len(header) < WORKERPOOL.HEADER.size:
+                    break
+                (length,) = WORKERPOOL.HEADER.unpack(header)
+                try:
+                    self.inbox.put(marshal.loads(stream.read(length)))
+                except (EOFError, ValueError):
+                    break
+            self.inbox.put(("exit",))
+
+        def send(self, message):
+            data = marshal.dumps(message)
+            try:
+                self.process.stdin.write(WORKERPOOL.HEADER.pack(len(data)) + data)
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+
+        def alive(self):
+            return self.process.poll() is None
+
+        def kill(self):
+            if self.alive():
+                self.process.kill()
+
+    def __init__(self):
+        self.hostPath = os.path.abspath("prgmhost.py")
+        self.size = 2
+        self.idle: list[WORKERPOOL.Worker] = []
+        self.busy: list[WORKERPOOL.Worker] = []
+        self.attached = False
+
+    def attach(self):
+        if self.attached:
+            return
+        self.attached = True
+        config = GLOBALMEM.get("WORKERS", DEFAULTS["WORKERS"])
+        self.size = config.get("POOL_SIZE", 2)
+        TaskManager.addTask(
+            self.update,
+            priority=TaskManager.priorities.HIGH,
+            name="WORKERPOOL.update",
+            wakes=False,
+        )
+        self.prewarm()
+
+    def prewarm(self):
+        # Busy workers return to the pool when their program ends, so they
+        # count towards its size.
+        while len(self.idle) + len(self.busy) < self.size:
+            self.idle.append(WORKERPOOL.Worker())
+
+    def launch(self, instance: "PROGRAM.Instance"):
+        """
+        Runs a program instance in a pooled worker process. Its windows are
+        created here from the ops the worker sends back.
+        """
+        self.attach()
+        worker = None
+        while self.idle and worker is None:
+            worker = self.idle.pop()
+            if not worker.alive():
+                worker = None
+        if worker is None:
+            worker = WORKERPOOL.Worker()
+        worker.instance = instance
+        worker.running = True
+        instance.worker = worker
+        self.busy.append(worker)
+        code = CODECACHE.load(instance.program.execPath, PROGRAM.INJECTOR)
+        worker.send(("run", instance.program.name, marshal.dumps(code)))
+
+    def release(self, worker: "WORKERPOOL.Worker"):
+        """
+        Detaches a worker from its instance. A worker whose program already
+        finished goes back to the pool; one that is still running is told to
+        stop and returns once it reports "done".
+        """
+        worker.instance = None
+        worker.windows.clear()
+        if worker.running and worker.alive():
+            worker.send(("stop",))
+            worker.stopDeadline = time.perf_counter() + self.STOP_TIMEOUT
+            return
+        self._recycle(worker)
+
+    def _recycle(self, worker: "WORKERPOOL.Worker"):
+        if worker in self.busy:
+            self.busy.remove(worker)
+        worker.running = False
+        worker.stopDeadline = None
+        if worker.alive() and len(self.idle) < self.size:
+            self.idle.append(worker)
+        else:
+            worker.kill()
+
+    def windowClosed(self, worker: "WORKERPOOL.Worker", window: "API.Window"):
+        for wid, w in list(worker.windows.items()):
+            if w is window:
+                del worker.windows[wid]
+                worker.send(("closed", wid))
+
+    def update(self):
+        """
+        Applies the window ops queued by every busy worker, once per frame.
+        Moves and text updates to the same window are coalesced.
+        """
+        for worker in list(self.busy):
+            ops = {}
+            applied = 0
+            finished = False
+            while applied < self.MAX_OPS_PER_FRAME:
+                try:
+                    batch = worker.inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if batch[0] in ("done", "exit"):
+                    worker.running = False
+                    finished = True
+                    break
+                for op in batch:
+                    applied += 1
+                    if op[0] in ("move", "setText"):
+                        ops.pop((op[0], op[1]), None)
+                        ops[(op[0], op[1])] = op
+                    else:
+                        ops[(op[0], op[1], applied)] = op
+            for op in ops.values():
+                self.apply(worker, op)
+            if finished and worker.instance is not None:
+                worker.instance.terminate()
+            elif worker.instance is None:
+                if finished:
+                    self._recycle(worker)
+                elif time.perf_counter() >= worker.stopDeadline:
+                    # A program that ignores "stop" costs its worker.
+                    worker.kill()
+                    self._recycle(worker)
+        if self.attached:
+            self.prewarm()
+
+    def apply(self, worker: "WORKERPOOL.Worker", op):
+        instance = worker.instance
+        if instance is None or not instance.alive:
+            return
+        if op[0] == "create":
+            kwargs = op[2]
+            worker.windows[op[1]] = API.Window(
+                name=kwargs["name"],
+                position=kwargs["position"],
+                size=kwargs["size"],
+                frameColor=kwargs["frameColor"],
+                winType=kwargs["winType"],
+                owner=instance,
+            )
+            window = worker.windows[op[1]]
+            saved = instance.pendingRestore.pop(window.key, None)
+            if saved is not None:
+                HIBERNATE.applyWindow(window, *saved)
+            return
+        window = worker.windows.get(op[1])
+        if window is None:
+            return
+        if op[0] == "move":
+            window.setGeometry(position=(op[2], op[3]))
+        elif op[0] == "setText":
+            window.setText(op[2])
+        elif op[0] == "close":
+            del worker.windows[op[1]]
+            window.destroy()
+
+    def shutdown(self):
+        for worker in self.idle + self.busy:
+            worker.kill()
+
+
+WORKERPOOL = WORKERPOOL()
+
+
+class ASYNCLOADER:
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ASYNCLOADER"
+        )
+        self.completed = queue.SimpleQueue()
+        self.placeholderTexture: Texture = None
+        self.attached = False
+
+    def attach(self):
+        if self.attached:
+            return
+        self.attached = True
+        TaskManager.addTask(
+            self.update,
+            priority=TaskManager.priorities.NORMAL,
+            name="ASYNCLOADER.update",
+            wakes=False,
+        )
+
+    def placeholder(self):
+        """
+        Shared 1x1 texture shown until the real one has streamed in.
+        """
+        if self.placeholderTexture is None:
+            tex = Texture("placeholder")
+            tex.setup2dTexture(1, 1, Texture.TUnsignedByte, Texture.FRgba)
+            tex.setRamImage(b"\x80\x80\x80\x40")
+            self.placeholderTexture = tex
+        return self.placeholderTexture
+
+    def loadTexture(self, path, callback):
+        """
+        Reads a texture on a worker thread. The callback receives the texture
+        (or None on failure) on the render thread, during TaskManager.update.
+        """
+        self.attach()
+        future = self.executor.submit(
+            TexturePool.loadTexture, Filename.fromOsSpecific(path)
+        )
+        future.add_done_callback(lambda f: self.completed.put((f, callback, path)))
+        return future
+
+    def update(self):
+        while True:
+            try:
+                future, callback, path = self.completed.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                tex = future.result()
+            except Exception as e:
+                print(f"Failed to load texture '{path}': ", e)
+                tex = None
+            callback(tex)
+
+
+ASYNCLOADER = ASYNCLOADER()
+
+
+class CATALOG:
+    def __init__(self):
+        self.path = "./src/prgm/CATALOG"
+        self.stats = {"cached": 0, "parsed": 0}
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                return loads(f.read())
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries):
+        tmpPath = self.path + ".tmp"
+        try:
+            with open(tmpPath, "w") as f:
+                dump(entries, f)
+            os.replace(tmpPath, self.path)
+        except OSError as e:
+            print("Could not write program catalog: ", e)
+
+    def scan(self, root):
+        """
+        Returns (directory, index.json data) for every program under root.
+        Only programs whose directory or index.json changed since the last
+        scan are parsed again; the catalog file is rewritten if anything changed.
+        """
+        cached = self._read()
+        entries = {}
+        result = []
+        for name in sorted(os.listdir(root)):
+            path = os.path.join(root, name)
+            if not os.path.isdir(path):
+                continue
+            try:
+                key = [
+                    os.stat(path).st_mtime_ns,
+                    os.stat(os.path.join(path, "index.json")).st_mtime_ns,
+                ]
+            except OSError:
+                continue
+            entry = cached.get(name)
+            if entry is not None and entry["key"] == key:
+                self.stats["cached"] += 1
+            else:
+                with open(os.path.join(path, "index.json"), "r") as f:
+                    entry = {"key": key, "data": loads(f.read())}
+                self.stats["parsed"] += 1
+            entries[name] = entry
+            result.append((path, entry["data"]))
+        if entries != cached:
+            self._write(entries)
+        return result
+
+
+CATALOG = CATALOG()
+
+
+class PROGRAM:
+    class runModes:
+        INLINE = "inline"
+        PROCESS = "process"
+
+    def __init__(self, path, data: dict = None):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+        if data is None:
+            with open(os.path.join(path, "index.json"), "r") as jsonFile:
+                data = loads(jsonFile.read())
+        self.data = data
+        self.path = os.path.abspath(path)
+        self.name = self.data["name"]
+        self.execPath = os.path.abspath(os.path.join(path, self.data["execPath"]))
+        self.iconPath = os.path.abspath(os.path.join(path, self.data["iconPath"]))
+        self.image = ASYNCLOADER.placeholder()
+        VRAM.acquireTextureAsync(self.iconPath, self.iconLoaded, owner=self.name)
+        self.hover_text = self.data["hover_text"]
+        self.description = self.data["description"]
+        self.programData = self.data["programData"]
+        self.runMode = self.data.get("runMode", PROGRAM.runModes.INLINE)
+        self.instances: list[PROGRAM.Instance] = []
+
+    def iconLoaded(self, tex: Texture):
+        if tex is None:
+            return
+        self.image = tex
+        TASKBAR.iconLoaded(self)
+
+    INJECTOR = """"""
+
+    def run(self, resumeState=None):
+        """
+        Starts a new instance. resumeState, when resuming from hibernation,
+        is what the program's hibernate() returned and is exposed to it as
+        RESUME.
+        """
+        instance = PROGRAM.Instance(self, resumeState)
+        self.instances.append(instance)
+        instance.start()
+        return instance
+
+    class InstanceAPI:
+        """
+        The API object seen by a running program. Windows, tasks and textures
+        created through it are owned by the program instance.
+        """
+
+        def __init__(self, instance: "PROGRAM.Instance"):
+            self._instance = instance
+
+        def __getattr__(self, name):
+            return getattr(API, name)
+
+        def Window(self, *args, **kwargs):
+            kwargs["owner"] = self._instance
+            return API.Window(*args, **kwargs)
+
+        def addTask(self, task, *args, **kwargs):
+            entry = TaskManager.addTask(task, *args, **kwargs)
+            self._instance.tasks.append(entry)
+            return entry
+
+        def removeTask(self, entry):
+            TaskManager.removeTask(entry)
+            if entry in self._instance.tasks:
+                self._instance.tasks.remove(entry)
+
+        def loadTexture(self, path):
+            tex = VRAM.acquireTexture(path, owner=self._instance.program.name)
+            if tex is not None:
+                self._instance.textures.append(tex)
+            return tex
+
+    class Instance:
+        def __init__(self, program: "PROGRAM", resumeState=None):
+            self.program = program
+            self.alive = True
+            self.worker: WORKERPOOL.Worker = None
+            self.windows: list[API.Window] = []
+            self.pendingRestore: dict[tuple, tuple] = {}
+            self.tasks: list[TaskManager.Task] = []
+            self.textures: list[Texture] = []
+            self.namespace = {
+                "__name__": f"prgm_{program.name}",
+                "__file__": program.execPath,
+                "__builtins__": __builtins__,
+                "API": PROGRAM.InstanceAPI(self),
+                "INSTANCE": self,
+                "RESUME": resumeState,
+            }
+
+        def start(self):
+            if self.program.runMode == PROGRAM.runModes.PROCESS:
+                WORKERPOOL.launch(self)
+                return
+            try:
+                code = CODECACHE.load(self.program.execPath, PROGRAM.INJECTOR)
+                exec(code, self.namespace)
+            except Exception as e:
+                print(f"Program '{self.program.name}' crashed: ", e)
+                self.terminate()
+                return
+            if not self.windows and not self.tasks:
+                self.terminate()
+
+        def hibernateState(self):
+            """
+            Per-app state for HIBERNATE: whatever the program's hibernate()
+            returns, provided marshal can store it.
+            """
+            hook = self.namespace.get("hibernate")
+            if not callable(hook):
+                return None
+            try:
+                state = hook()
+                marshal.dumps(state)
+            except Exception as e:
+                print(f"Program '{self.program.name}' state not saved: ", e)
+                return None
+            return state
+
+        def windowClosed(self, window: "API.Window"):
+            if window in self.windows:
+                self.windows.remove(window)
+                if self.worker is not None:
+                    WORKERPOOL.windowClosed(self.worker, window)
+                if not self.windows and self.alive:
+                    self.terminate()
+
+        def terminate(self):
+            """
+            Tears down everything the instance created and drops its namespace.
+            """
+            if not self.alive:
+                return
+            self.alive = False
+            if self.worker is not None:
+                WORKERPOOL.release(self.worker)
+                self.worker = None
+            for window in list(self.windows):
+                window.destroy()
+            for entry in self.tasks:
+                TaskManager.removeTask(entry)
+            for tex in self.textures:
+                VRAM.release(tex, owner=self.program.name)
+            self.windows.clear()
+            self.tasks.clear()
+            self.textures.clear()
+            self.namespace.clear()
+            if self in self.program.instances:
+                self.program.instances.remove(self)
+
+
+class SEARCH:
+    """
+    Incremental inverted index behind the Search app. Programs, windows and
+    GLOBALMEM settings are documents; each token maps to the documents that
+    contain it, and every token is also filed under its prefixes and padded
+    trigrams, so typeahead and typo-tolerant lookups never scan documents.
+    """
+
+    MAX_PREFIX = 6
+    FIELD_WEIGHTS = (3.0, 2.0, 1.0)
+    KIND_BOOST = {"program": 1.5, "window": 1.2, "setting": 1.0}
+    EXCLUDED_SETTINGS = {"AUTH"}
+
+    class Document:
+        __slots__ = ("id", "kind", "key", "title", "subtitle", "target", "terms")
+
+        def __init__(self, id, kind, key, title, subtitle, target):
+            self.id = id
+            self.kind = kind
+            self.key = key
+            self.title = title
+            self.subtitle = subtitle
+            self.target = target
+            self.terms: dict[str, float] = {}
+
+    def __init__(self):
+        self.documents: dict[int, SEARCH.Document] = {}
+        self.byKey: dict[tuple, int] = {}
+        self.postings: dict[str, dict[int, float]] = {}
+        self.prefixes: dict[str, set[str]] = {}
+        self.trigrams: dict[str, set[str]] = {}
+        self.settingPaths: dict[str, list[str]] = {}
+        self.nextId = 0
+        self.lastQueryTime = 0.0
+        self.stats = {"queries": 0, "totalTime": 0.0, "slowest": 0.0}
+
+    @staticmethod
+    def tokenize(text):
+        return re.findall(r"[a-z0-9]+", str(text).lower())
+
+    @staticmethod
+    def grams(token):
+        padded = f" {token} "
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    def _addTerm(self, token):
+        for n in range(1, min(len(token), SEARCH.MAX_PREFIX) + 1):
+            self.prefixes.setdefault(token[:n], set()).add(token)
+        for gram in self.grams(token):
+            self.trigrams.setdefault(gram, set()).add(token)
+
+    def _removeTerm(self, token):
+        for table, keys in [
+            (self.prefixes, [token[:n] for n in range(1, SEARCH.MAX_PREFIX + 1)]),
+            (self.trigrams, self.grams(token)),
+        ]:
+            for key in set(keys):
+                tokens = table.get(key)
+                if tokens is not None:
+                    tokens.discard(token)
+                    if not tokens:
+                        del table[key]
+
+    def add(self, kind, key, title, subtitle, fields, target):
+        """
+        Indexes (or reindexes) a document. fields are weighted by position
+        with FIELD_WEIGHTS, so the first one should be the title.
+        """
+        self.remove(kind, key)
+        self.nextId += 1
+        document = SEARCH.Document(self.nextId, kind, key, title, subtitle, target)
+        for weight, text in zip(SEARCH.FIELD_WEIGHTS, fields):
+            for token in self.tokenize(text):
+                if weight > document.terms.get(token, 0):
+                    document.terms[token] = weight
+        for token, weight in document.terms.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = {}
+                self._addTerm(token)
+            postings[document.id] = weight
+        self.documents[document.id] = document
+        self.byKey[(kind, key)] = document.id
+        return document
+
+    def remove(self, kind, key):
+        docId = self.byKey.pop((kind, key), None)
+        if docId is None:
+            return
+        document = self.documents.pop(docId)
+        for token in document.terms:
+            postings = self.postings[token]
+            del postings[docId]
+            if not postings:
+                del self.postings[token]
+                self._removeTerm(token)
+
+    def addProgram(self, program: "PROGRAM"):
+        self.add(
+            "program",
+            program,
+            program.name,
+            program.description,
+            (program.name, program.hover_text, program.description),
+            program,
+        )
+
+    def removeProgram(self, program: "PROGRAM"):
+        self.remove("program", program)
+
+    def addWindow(self, window: "API.Window"):
+        owner = window.owner.program.name if window.owner is not None else ""
+        self.add(
+            "window",
+            window.id,
+            window.name,
+            owner or window.winType,
+            (window.name, owner, window.winType),
+            window,
+        )
+
+    def removeWindow(self, window: "API.Window"):
+        self.remove("window", window.id)
+
+    def indexSettings(self, keys=None):
+        """
+        Reindexes the leaves of the given top-level GLOBALMEM keys (all of
+        them by default); keys that no longer exist are dropped.
+        """
+        for key in list(GLOBALMEM.keys()) if keys is None else keys:
+            for path in self.settingPaths.pop(key, []):
+                self.remove("setting", path)
+            if key in SEARCH.EXCLUDED_SETTINGS or key not in GLOBALMEM:
+                continue
+            paths = self.settingPaths[key] = []
+            stack = [(key, GLOBALMEM[key])]
+            while stack:
+                path, value = stack.pop()
+                if isinstance(value, dict):
+                    stack.extend((f"{path}.{k}", v) for k, v in value.items())
+                    continue
+                text = str(value)
+                self.add(
+                    "setting",
+                    path,
+                    path,
+                    text.split("\n")[0][:60],
+                    (path, "", text[:200]),
+                    path,
+                )
+                paths.append(path)
+
+    def _expand(self, queryToken, isLast):
+        """
+        Index tokens matching one query token, with a match score: exact,
+        then prefix (scored higher on the token being typed), then trigram
+        similarity as a fallback for typos.
+        """
+        matches = {}
+        if queryToken in self.postings:
+            matches[queryToken] = 1.0
+        for token in self.prefixes.get(queryToken[: SEARCH.MAX_PREFIX], ()):
+            if token != queryToken and token.startswith(queryToken):
+                matches[token] = 0.8 if isLast else 0.6
+        if matches or len(queryToken) < 3:
+            return matches
+        grams = self.grams(queryToken)
+        shared = Counter()
+        for gram in grams:
+            for token in self.trigrams.get(gram, ()):
+                shared[token] += 1
+        # A padded token of length n has n trigrams, so this is the Dice
+        # coefficient of the two trigram sets.
+        for token, count in shared.items():
+            similarity = 2 * count / (len(grams) + len(token))
+            if similarity >= 0.5:
+                matches[token] = 0.5 * similarity
+        return matches
+
+    def search(self, query, limit=8):
+        """
+        Ranked documents matching every token of query.
+        """
+        start = time.perf_counter()
+        tokens = self.tokenize(query)
+        scores = None
+        for index, queryToken in enumerate(tokens):
+            tokenScores = {}
+            matches = self._expand(queryToken, index == len(tokens) - 1)
+            for token, matchScore in matches.items():
+                for docId, weight in self.postings[token].items():
+                    score = matchScore * weight
+                    if score > tokenScores.get(docId, 0):
+                        tokenScores[docId] = score
+            if scores is None:
+                scores = tokenScores
+            else:
+                scores = {
+                    docId: scores[docId] + score
+                    for docId, score in tokenScores.items()
+                    if docId in scores
+                }
+            if not scores:
+                break
+        results = []
+        if scores:
+            documents = self.documents
+            ranked = heapq.nlargest(
+                limit,
+                scores.items(),
+                key=lambda item: item[1] * SEARCH.KIND_BOOST[documents[item[0]].kind],
+            )
+            results = [documents[docId] for docId, _ in ranked]
+        self.lastQueryTime = time.perf_counter() - start
+        self.stats["queries"] += 1
+        self.stats["totalTime"] += self.lastQueryTime
+        self.stats["slowest"] = max(self.stats["slowest"], self.lastQueryTime)
+        return results
+
+
+SEARCH = SEARCH()
+API.Search = SEARCH
+
+
+class TextureAtlas:
+    def __init__(self, name, cellSize=64, columns=16, rows=4):
+        self.cellSize = cellSize
+        self.columns = columns
+        self.rows = rows
+        self.slots: dict = {}
+        self.freeSlots: list[int] = []
+        self.nextSlot = 0
+        self.generation = 0
+        self.dirty = True
+        self.image = self._blank(columns * cellSize, rows * cellSize)
+        self.texture = Texture(name)
+        self.texture.setMinfilter(SamplerState.FTLinear)
+        self.texture.setMagfilter(SamplerState.FTLinear)
+        self.texture.setWrapU(SamplerState.WMClamp)
+        self.texture.setWrapV(SamplerState.WMClamp)
+
+    def _blank(self, width, height):
+        image = PNMImage(width, height, 4)
+        image.fill(0, 0, 0)
+        image.alphaFill(0)
+        return image
+
+    def _grow(self):
+        """
+        Doubles the atlas height. Existing cells keep their pixel position,
+        but every UV range changes, which callers detect through generation.
+        """
+        image = self._blank(self.columns * self.cellSize, self.rows * 2 * self.cellSize)
+        image.copySubImage(self.image, 0, 0)
+        self.image = image
+        self.rows *= 2
+        self.generation += 1
+        self.dirty = True
+
+    def add(self, key, source: PNMImage):
+        """
+        Packs an image into a cell (reusing the key's cell if it has one).
+        The texture is re-uploaded on the next flush().
+        """
+        slot = self.slots.get(key)
+        if slot is None:
+            if self.freeSlots:
+                slot = self.freeSlots.pop()
+            else:
+                if self.nextSlot >= self.columns * self.rows:
+                    self._grow()
+                slot = self.nextSlot
+                self.nextSlot += 1
+            self.slots[key] = slot
+        if not source.hasAlpha():
+            source = PNMImage(source)
+            source.addAlpha()
+            source.alphaFill(1)
+        cell = PNMImage(self.cellSize - 2, self.cellSize - 2, 4)
+        cell.gaussianFilterFrom(1.0, source)
+        x, y = self._origin(slot)
+        self.image.copySubImage(cell, x + 1, y + 1)
+        self.dirty = True
+
+    def remove(self, key):
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            x, y = self._origin(slot)
+            self.image.copySubImage(self._blank(self.cellSize, self.cellSize), x, y)
+            self.freeSlots.append(slot)
+            self.dirty = True
+
+    def _origin(self, slot):
+        return (slot % self.columns) * self.cellSize, (
+            slot // self.columns
+        ) * self.cellSize
+
+    def uvRange(self, key):
+        """
+        Returns ((u0, v0), (u1, v1)) of a cell, inset by the 1px padding.
+        """
+        x, y = self._origin(self.slots[key])
+        width = self.image.getXSize()
+        height = self.image.getYSize()
+        return (
+            ((x + 1) / width, 1 - (y + self.cellSize - 1) / height),
+            ((x + self.cellSize - 1) / width, 1 - (y + 1) / height),
+        )
+
+    def flush(self):
+        if self.dirty:
+            self.texture.load(self.image)
+            self.dirty = False
 
 
 class TASKBAR:
+    SPACING = 0.135
+    OUTLINE = "__outline__"
+    PLACEHOLDER = "__placeholder__"
+
+    class Entry:
+        def __init__(self, program, button, hoverHandle):
+            self.program: PROGRAM = program
+            self.button: DirectButton = button
+            self.hoverHandle = hoverHandle
+            self.card: NodePath = None
+            self.xPos = 0
+
+        def destroy(self):
+            MouseOverManager.unregisterElement(self.hoverHandle)
+            self.button.destroy()
+            if self.card is not None:
+                self.card.removeNode()
+
     def __init__(self):
         self.programs = []
-        self.nodes = []
+        self.entries: dict[PROGRAM, TASKBAR.Entry] = {}
+        self.parent: UIManager.Window = None
+        self.batchDepth = 0
+        self.layoutPending = False
+        self.atlas: TextureAtlas = None
+        self.atlasGeneration = 0
+        self.iconSource = NodePath("taskbarIcons")
+        self.iconLayer: NodePath = None
+        self.flattenPending = False
+        self.hovered: TASKBAR.Entry = None
 
     def load(self, parent: "UIManager.Window" = None):
         self.parent = parent
+        self.atlas = TextureAtlas("taskbarAtlas")
+        outline = VRAM.acquireTexture("./src/img/rounded_outline.png", owner="TASKBAR")
+        self.atlas.add(self.OUTLINE, self.atlasImage(outline))
+        VRAM.release(outline, owner="TASKBAR", unload=True)
+        # One shared cell stands in for every icon that is still streaming.
+        self.atlas.add(self.PLACEHOLDER, self.atlasImage(ASYNCLOADER.placeholder()))
+        self.atlasGeneration = self.atlas.generation
+        self.hoverOutline = self.makeCard(self.OUTLINE, 0.07, parent.root)
+        self.hoverOutline.setTexture(self.atlas.texture)
+        self.hoverOutline.setTransparency(TransparencyAttrib.MAlpha)
+        self.hoverOutline.setColorScale(0.5, 0.5, 0.5, 1)
+        self.hoverOutline.hide()
+        self.hoverLabel = DirectLabel(
+            text="",
+            text_font=VRAM["WIN11FONT"],
+            text_fg=(1, 1, 1, 1),
+            scale=0.05,
+            parent=parent.root,
+            frameColor=(0, 0, 0, 0.25),
+        )
+        self.hoverLabel.setTransparency(TransparencyAttrib.MAlpha)
+        self.hoverLabel.hide()
+        TaskManager.addTask(
+            self.flush,
+            priority=TaskManager.priorities.LOW,
+            rate=20,
+            name="TASKBAR.flush",
+            wakes=False,
+        )
+
         currentPath = os.path.dirname(os.path.abspath(__file__))
-        os.chdir(os.path.join(currentPath, "src", "prgm"))
-        for filepath in sorted(os.listdir()):
-            if os.path.isdir(filepath):
-                self.addProgram(PROGRAM(filepath))
-        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        with self.batch():
+            for path, data in CATALOG.scan(os.path.join(currentPath, "src", "prgm")):
+                self.addProgram(PROGRAM(path, data))
 
         self.border = DirectFrame(
             parent=parent.root2,
@@ -547,81 +3583,168 @@ class TASKBAR:
             pos=(0, 0, -0.925),
         )
         self.border.setTransparency(TransparencyAttrib.MAlpha)
-        self.rebuild()
 
-    def rebuild(self):
-        programsLen = len(self.getPrograms())
-        if programsLen == 0:
+    @contextmanager
+    def batch(self):
+        """
+        Defers layout until the outermost batch exits, so bulk adds and
+        removes cost a single layout pass.
+        """
+        self.batchDepth += 1
+        try:
+            yield self
+        finally:
+            self.batchDepth -= 1
+            if self.batchDepth == 0 and self.layoutPending:
+                self.layout()
+
+    def makeCard(self, key, size, parent):
+        cm = CardMaker("taskbarCard")
+        cm.setFrame(-size, size, -size, size)
+        cm.setUvRange(*self.atlas.uvRange(key))
+        return parent.attachNewNode(cm.generate())
+
+    def updateCard(self, entry: "TASKBAR.Entry"):
+        if entry.card is not None:
+            entry.card.removeNode()
+            entry.card = None
+        key = entry.program if entry.program in self.atlas.slots else self.PLACEHOLDER
+        entry.card = self.makeCard(key, 0.06, self.iconSource)
+        entry.card.setPos(entry.xPos, 0, -0.925)
+        self.flattenPending = True
+
+    @staticmethod
+    def atlasImage(tex: Texture):
+        """
+        Pixels of a VRAM texture (baked or source) for packing into the atlas.
+        """
+        image = PNMImage()
+        if not tex.hasRamImage():
+            tex.reload()
+        tex.store(image)
+        return image
+
+    def addIcon(self, entry: "TASKBAR.Entry"):
+        program = entry.program
+        if program not in self.atlas.slots:
+            tex = program.image
+            if tex is not None and tex is not ASYNCLOADER.placeholder():
+                self.atlas.add(program, self.atlasImage(tex))
+                # The atlas holds the only copy of the icon from here on.
+                VRAM.release(tex, owner=program.name, unload=True)
+                program.image = None
+        self.updateCard(entry)
+
+    def createEntry(self, program: PROGRAM):
+        programButton = DirectButton(
+            parent=self.parent.root,
+            scale=(0.06),
+            frameColor=(0, 0, 0, 0),
+            frameSize=(-1, 1, -1, 1),
+            geom=None,
+            relief=None,
+            command=program.run,
+        )
+        entry = TASKBAR.Entry(program, programButton, None)
+        entry.hoverHandle = MouseOverManager.registerElement(
+            element=programButton,
+            hitbox_scale=(0.6, 0.6),
+            callback=self.mouseOver,
+            entry=entry,
+        )
+        self.addIcon(entry)
+        return entry
+
+    def mouseOver(self, hover, entry: "TASKBAR.Entry"):
+        if hover:
+            self.hovered = entry
+            self.hoverOutline.setPos(entry.xPos, 0, -0.925)
+            self.hoverOutline.show()
+            self.hoverLabel["text_font"] = GLYPHCACHE.fontFor(entry.program.hover_text)
+            self.hoverLabel["text"] = entry.program.hover_text
+            self.hoverLabel.setPos(entry.xPos, 0, -0.825)
+            self.hoverLabel.show()
+        elif self.hovered is entry:
+            self.hovered = None
+            self.hoverOutline.hide()
+            self.hoverLabel.hide()
+
+    def layout(self):
+        """
+        Creates nodes for programs that do not have them yet and repositions
+        every entry. Existing entries are never rebuilt.
+        """
+        if self.batchDepth > 0 or self.parent is None:
+            self.layoutPending = True
             return
-        for nodes in self.nodes:
-            for n in nodes:
-                n.removeNode()
-
-        self.nodes.clear()
-
-        program: PROGRAM
-        for i, program in enumerate(self.getPrograms()):
-            spacing = 0.135
-            xPos = -0.925 + (i * spacing) + (spacing * (programsLen - 1) / 2)
-            outline = OnscreenImage(
-                image="./src/img/rounded_outline.png",
-                scale=(0.07, 0.07, 0.07),
-                pos=(xPos, 0, -0.925),
-                parent=self.parent.root,
-            )
-            outline.setTransparency(TransparencyAttrib.MAlpha)
-
-            programButton = DirectButton(
-                parent=self.parent.root,
-                image=program.image,
-                scale=(0.06),
-                pos=(xPos, 0, -0.925),
-                frameColor=(0.5, 0.5, 0.5, 0.5),
-                frameSize=(-1, 1, -1, 1),
-                geom=None,
-                relief=None,
-                command=program.run,
+        self.layoutPending = False
+        programsLen = len(self.programs)
+        for i, program in enumerate(self.programs):
+            entry = self.entries.get(program)
+            if entry is None:
+                entry = self.entries[program] = self.createEntry(program)
+            entry.xPos = (
+                -0.925 + (i * self.SPACING) + (self.SPACING * (programsLen - 1) / 2)
             )
-            programButton.setTransparency(TransparencyAttrib.MAlpha)
+            entry.button.setPos(entry.xPos, 0, -0.925)
+            if entry.card is not None:
+                entry.card.setPos(entry.xPos, 0, -0.925)
+            MouseOverManager.markDirty(entry.hoverHandle)
+        self.flattenPending = True
 
-            programHoverText = DirectLabel(
-                text=program.hover_text,
-                text_font=VRAM["WIN11FONT"],
-                text_fg=(1, 1, 1, 1),
-                pos=(xPos, 0, -0.825),
-                scale=0.05,
-                parent=self.parent.root,
-                frameColor=(0, 0, 0, 0.25),
-            )
-            programHoverText.setTransparency(TransparencyAttrib.MAlpha)
-
-            programHoverText.setColorScale(1, 1, 1, 0)
-            outline.setColorScale(0.5, 0.5, 0.5, 0)
+    def flush(self):
+        """
+        Uploads the atlas and re-flattens the icon cards into a single batch,
+        at most once per call no matter how many icons changed.
+        """
+        if self.atlas.generation != self.atlasGeneration:
+            self.atlasGeneration = self.atlas.generation
+            for entry in self.entries.values():
+                self.updateCard(entry)
+            self.hoverOutline.removeNode()
+            self.hoverOutline = self.makeCard(self.OUTLINE, 0.07, self.parent.root)
+            self.hoverOutline.setTexture(self.atlas.texture)
+            self.hoverOutline.setTransparency(TransparencyAttrib.MAlpha)
+            self.hoverOutline.setColorScale(0.5, 0.5, 0.5, 1)
+            self.hoverOutline.hide()
+        self.atlas.flush()
+        if not self.flattenPending:
+            return
+        self.flattenPending = False
+        if self.iconLayer is not None:
+            self.iconLayer.removeNode()
+        self.iconLayer = self.iconSource.copyTo(self.parent.root)
+        self.iconLayer.setTexture(self.atlas.texture)
+        self.iconLayer.setTransparency(TransparencyAttrib.MAlpha)
+        self.iconLayer.flattenStrong()
 
-            def mouseOver(hover, outline, programHoverText):
-                if hover:
-                    programHoverText.setColorScale(1, 1, 1, 1)
-                    outline.setColorScale(0.5, 0.5, 0.5, 1)
-                else:
-                    programHoverText.setColorScale(1, 1, 1, 0)
-                    outline.setColorScale(0.5, 0.5, 0.5, 0)
+    def rebuild(self):
+        for entry in self.entries.values():
+            entry.destroy()
+        self.entries.clear()
+        self.layout()
 
-            self.nodes.append([outline, programButton, programHoverText])
-            MouseOverManager.registerElement(
-                element=programButton,
-                hitbox_scale=(0.6, 0.6),
-                callback=mouseOver,
-                outline=outline,
-                programHoverText=programHoverText,
-            )
+    def iconLoaded(self, program: PROGRAM):
+        entry = self.entries.get(program)
+        if entry is not None:
+            self.addIcon(entry)
 
     def addProgram(self, program):
         self.programs.append(program)
-        self.rebuild()
+        SEARCH.addProgram(program)
+        self.layout()
 
     def removeProgram(self, program):
         self.programs.remove(program)
-        self.rebuild()
+        SEARCH.removeProgram(program)
+        entry = self.entries.pop(program, None)
+        if entry is not None:
+            if self.hovered is entry:
+                self.mouseOver(False, entry)
+            entry.destroy()
+            self.atlas.remove(program)
+            self.flattenPending = True
+        self.layout()
 
     def getPrograms(self):
         return self.programs
@@ -630,33 +3753,731 @@ class TASKBAR:
 TASKBAR = TASKBAR()
 
 
-class TaskManager:
+class FRAMEPACER:
+    ACTIVE = "ACTIVE"
+    IDLE = "IDLE"
+
     def __init__(self):
-        self.tasks = []
+        self.enabled = False
+        self.mode = FRAMEPACER.ACTIVE
+        self.idleRate = 10
+        self.idleDelay = 2.0
+        self.lastActivity = 0.0
+        self.lastMousePos = None
+        self.activeClockMode = None
+        self.activeRate = 0
+        self.timeInMode = {FRAMEPACER.ACTIVE: 0.0, FRAMEPACER.IDLE: 0.0}
+        self.events = DirectObject()
+
+    def attach(self, base: "OS"):
+        config = GLOBALMEM.get("FRAMEPACING", DEFAULTS["FRAMEPACING"])
+        self.enabled = config.get("ENABLED", True)
+        self.idleRate = config.get("IDLE_RATE", 10)
+        self.idleDelay = config.get("IDLE_DELAY", 2.0)
+        if not self.enabled:
+            return
+        self.activeClockMode = globalClock.getMode()  # type: ignore
+        self.activeRate = ConfigVariableDouble("clock-frame-rate").getValue()
+        self.lastActivity = globalClock.getRealTime()  # type: ignore
+        base.buttonThrowers[0].node().setButtonDownEvent("framepacer-input")
+        self.events.accept("framepacer-input", lambda _: self.wake())
+        base.taskMgr.add(self.pace_task, "FRAMEPACER", sort=-100)
+
+    def wake(self):
+        """
+        Marks the desktop as busy. Returns to the full frame rate immediately.
+        """
+        if not self.enabled:
+            return
+        self.lastActivity = globalClock.getRealTime()  # type: ignore
+        if self.mode == FRAMEPACER.IDLE:
+            self.setMode(FRAMEPACER.ACTIVE)
+
+    def setMode(self, mode):
+        self.mode = mode
+        if mode == FRAMEPACER.IDLE:
+            globalClock.setMode(ClockObject.MLimited)  # type: ignore
+            globalClock.setFrameRate(self.idleRate)  # type: ignore
+        else:
+            globalClock.setMode(self.activeClockMode)  # type: ignore
+            globalClock.setFrameRate(self.activeRate)  # type: ignore
+
+    def isBusy(self):
+        if base.mouseWatcherNode.hasMouse():
+            mouse = base.mouseWatcherNode.getMouse()
+            mousePos = (mouse.x, mouse.y)
+            if mousePos != self.lastMousePos:
+                self.lastMousePos = mousePos
+                return True
+        if ivalMgr.getNumIntervals() > 0:  # type: ignore
+            return True
+        if API.WindowController.window is not None:
+            return True
+        if UIManager.transition is not None:
+            return True
+        if TaskManager.worked:
+            return True
+        return False
+
+    def pace_task(self, task):
+        self.timeInMode[self.mode] += globalClock.getDt()  # type: ignore
+        if self.isBusy():
+            self.wake()
+        elif (
+            self.mode == FRAMEPACER.ACTIVE
+            and globalClock.getRealTime() - self.lastActivity >= self.idleDelay  # type: ignore
+        ):
+            self.setMode(FRAMEPACER.IDLE)
+        return task.cont
+
+    def report(self):
+        return {mode: round(t, 3) for mode, t in self.timeInMode.items()}
+
+
+FRAMEPACER = FRAMEPACER()
+
+
+class PROFILER:
+    class Stat:
+        __slots__ = ("calls", "total", "max", "overruns", "samples")
+
+        def __init__(self, sampleSize):
+            self.calls = 0
+            self.total = 0.0
+            self.max = 0.0
+            self.overruns = 0
+            self.samples = deque(maxlen=sampleSize)
+
+        def add(self, elapsed, threshold):
+            self.calls += 1
+            self.total += elapsed
+            self.samples.append(elapsed)
+            if elapsed > self.max:
+                self.max = elapsed
+            if elapsed > threshold:
+                self.overruns += 1
+
+        def summary(self):
+            ordered = sorted(self.samples)
+            p99 = (
+                ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+                if ordered
+                else 0
+            )
+            return {
+                "calls": self.calls,
+                "total": self.total,
+                "mean": self.total / self.calls if self.calls else 0,
+                "p99": p99,
+                "max": self.max,
+                "overruns": self.overruns,
+            }
+
+    def __init__(self, sampleSize=1024, overrunThreshold=0.004):
+        self.enabled = True
+        self.sampleSize = sampleSize
+        self.overrunThreshold = overrunThreshold
+        self.stats: dict[str, PROFILER.Stat] = {}
+        self.overlay = None
+        self.dumpPath = "./HYBERFIL.profile.json"
+        self.taskRuns = {}
+
+    def record(self, name, elapsed):
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = PROFILER.Stat(self.sampleSize)
+        stat.add(elapsed, self.overrunThreshold)
+
+    def report(self):
+        return {name: stat.summary() for name, stat in self.stats.items()}
+
+    def sampleTaskMgr(self, task):
+        """
+        Records the duration of every Panda task that ran this frame. Runs with
+        a late sort so it sees this frame's timings. Panda does not expose a
+        run count, but each run moves a task's average duration and a restart
+        moves its start time, so a task whose pair is unchanged did not run.
+        """
+        sleeping = {t.getTaskId() for t in taskMgr.getDoLaters()}  # type: ignore
+        taskRuns = {}
+        for t in taskMgr.getTasks():  # type: ignore
+            taskId = t.getTaskId()
+            if t.name == "PROFILER" or taskId in sleeping:
+                continue
+            runs = taskRuns[taskId] = (t.getStartTime(), t.getAverageDt())
+            if self.taskRuns.get(taskId) != runs:
+                self.record("taskMgr:" + t.name, t.getDt())
+        self.taskRuns = taskRuns
+        return task.cont
+
+    def toggleOverlay(self):
+        if self.overlay is None:
+            self.overlay = OnscreenText(
+                text="",
+                fg=(1, 1, 0, 1),
+                bg=(0, 0, 0, 0.6),
+                pos=(-1.75, 0.95),
+                scale=0.035,
+                align=TextNode.ALeft,
+                mayChange=True,
+                parent=aspect2d,  # type: ignore
+            )
+            self.overlay.setBin("gui-popup", 100)
+            self.updateOverlay()
+        else:
+            self.overlay.destroy()
+            self.overlay = None
+
+    def updateOverlay(self):
+        if self.overlay is None:
+            return
+        rows = sorted(self.report().items(), key=lambda i: -i[1]["total"])[:12]
+        lines = ["task                              calls  mean(ms)  p99(ms)  over"]
+        for name, s in rows:
+            lines.append(
+                f"{name[:32]:<32} {s['calls']:>7} {s['mean'] * 1000:>9.3f} "
+                f"{s['p99'] * 1000:>8.3f} {s['overruns']:>5}"
+            )
+        self.overlay.setText("\n".join(lines))
+
+    def dump(self):
+        if not self.stats:
+            return
+        with open(self.dumpPath, "w") as f:
+            dump(self.report(), f, indent=4)
+        print("Saved task profile")
+
+    def attach(self, base: "OS"):
+        config = GLOBALMEM.get("PROFILER", DEFAULTS["PROFILER"])
+        self.enabled = config.get("ENABLED", True)
+        if not self.enabled:
+            return
+        base.taskMgr.add(self.sampleTaskMgr, "PROFILER", sort=1000)
+        base.accept("f12", self.toggleOverlay)
+        TaskManager.addTask(
+            self.updateOverlay,
+            priority=TaskManager.priorities.LOW,
+            rate=2,
+            wakes=False,
+        )
+        if config.get("OVERLAY", False):
+            self.toggleOverlay()
+
+
+PROFILER = PROFILER()
+
 
-    def addTask(self, task, *args, **kwargs):
-        self.tasks.append([task, args, kwargs])
+class TaskManager:
+    class priorities:
+        CRITICAL = 0
+        HIGH = 10
+        NORMAL = 50
+        LOW = 100
+
+    class rates:
+        EVERY_FRAME = 0
+        IDLE = -1
+
+    DONE = "DONE"
+
+    class Task:
+        __slots__ = (
+            "task",
+            "name",
+            "args",
+            "kwargs",
+            "priority",
+            "rate",
+            "interval",
+            "nextRun",
+            "deferred",
+            "alive",
+            "order",
+            "wakes",
+        )
+
+        def __init__(self, task, name, args, kwargs, priority, rate, order, wakes):
+            self.task = task
+            self.name = name or getattr(task, "__qualname__", repr(task))
+            self.args = args
+            self.kwargs = kwargs
+            self.priority = priority
+            self.rate = rate
+            self.interval = 1 / rate if rate > 0 else 0
+            self.nextRun = 0
+            self.deferred = 0
+            self.alive = True
+            self.order = order
+            self.wakes = wakes
+
+    def __init__(self, frameBudget=0.004, maxDeferredFrames=10):
+        self.tasks: list[TaskManager.Task] = []
+        self.pending: list[TaskManager.Task] = []
+        self.frameBudget = frameBudget
+        self.maxDeferredFrames = maxDeferredFrames
+        self.ticking = False
+        self.order = 0
+        self.worked = False
+
+    def addTask(
+        self,
+        task,
+        *args,
+        priority=priorities.NORMAL,
+        rate=rates.EVERY_FRAME,
+        name=None,
+        wakes=True,
+        **kwargs,
+    ):
+        """
+        Schedules a callable on the frame loop.
+        :param priority: Lower values run first. CRITICAL tasks are never deferred.
+        :param rate: rates.EVERY_FRAME, rates.IDLE (only with spare frame budget) or a frequency in Hz.
+        :param name: Label used by PROFILER, defaults to the callable's qualified name.
+        :param wakes: Whether running this task keeps FRAMEPACER at the full frame rate.
+            Polling tasks that wake the pacer themselves when they change something pass False.
+        :return: The task entry, which can be passed to removeTask.
+        """
+        self.order += 1
+        entry = TaskManager.Task(
+            task, name, args, kwargs, priority, rate, self.order, wakes
+        )
+        if self.ticking:
+            self.pending.append(entry)
+        else:
+            self._insert(entry)
+        return entry
+
+    def _insert(self, entry):
+        self.tasks.append(entry)
+        self.tasks.sort(key=lambda t: (t.priority, t.order))
 
     def removeTask(self, task):
-        for t, a, kw in self.tasks:
-            if t == task:
-                self.tasks.remove([t, a, kw])
+        for entry in self.tasks + self.pending:
+            if entry.alive and (entry is task or entry.task == task):
+                entry.alive = False
                 break
+        if not self.ticking:
+            self._collect()
+
+    def _collect(self):
+        self.tasks = [t for t in self.tasks if t.alive]
+        for entry in self.pending:
+            if entry.alive:
+                self._insert(entry)
+        self.pending.clear()
+
+    def _run(self, entry):
+        start = time.perf_counter()
+        result = entry.task(*entry.args, **entry.kwargs)
+        if PROFILER.enabled:
+            PROFILER.record(entry.name, time.perf_counter() - start)
+        if result == TaskManager.DONE:
+            entry.alive = False
 
     def update(self, p3d_task):
-        for task, args, kwargs in self.tasks:
-            task(*args, **kwargs)
+        start = time.perf_counter()
+        deadline = start + self.frameBudget
+        self.ticking = True
+        worked = False
+        idle = []
+        try:
+            for entry in self.tasks:
+                if not entry.alive:
+                    continue
+                if entry.rate == TaskManager.rates.IDLE:
+                    idle.append(entry)
+                    continue
+                if entry.interval and start < entry.nextRun:
+                    continue
+                if (
+                    entry.priority > TaskManager.priorities.CRITICAL
+                    and entry.deferred < self.maxDeferredFrames
+                    and time.perf_counter() >= deadline
+                ):
+                    entry.deferred += 1
+                    continue
+                entry.deferred = 0
+                if entry.interval:
+                    entry.nextRun += entry.interval
+                    if entry.nextRun <= start:
+                        entry.nextRun = start + entry.interval
+                self._run(entry)
+                worked = worked or entry.wakes
+            for entry in idle:
+                if time.perf_counter() >= deadline:
+                    break
+                if entry.alive:
+                    self._run(entry)
+        finally:
+            self.ticking = False
+            self.worked = worked
+            self._collect()
         return p3d_task.cont
 
 
 TaskManager = TaskManager()
 
 
+class BOOT:
+    class Stage:
+        def __init__(self, name, build, after, textures):
+            self.name = name
+            self.build = build
+            self.after = list(after)
+            self.texturePaths = list(textures)
+            self.textures: dict[str, Texture] = {}
+            self.started = None
+            self.finished = None
+            self.buildTime = 0.0
+
+        @property
+        def duration(self):
+            if self.started is None or self.finished is None:
+                return None
+            return self.finished - self.started
+
+    def __init__(self):
+        self.begin = time.perf_counter()
+        self.stages: dict[str, BOOT.Stage] = {}
+        self.waiting: dict[str, list] = {}
+        self.firstFrameStage = None
+        self.firstFrame = None
+        self.interactive = None
+
+    def addStage(self, name, build, after=(), textures=()):
+        """
+        Registers a boot stage. Its textures start streaming in through
+        ASYNCLOADER as soon as the boot starts; build runs on the render
+        thread once every stage in after has finished and they have all
+        arrived in stage.textures. The boot's references are dropped after
+        build, so whatever build made should acquire its own.
+        """
+        self.stages[name] = BOOT.Stage(name, build, after, textures)
+
+    def start(self, firstFrame=None):
+        self.firstFrameStage = firstFrame
+        for stage in self.stages.values():
+            self._prefetch(stage)
+        self.advance()
+        TaskManager.addTask(
+            self.update,
+            priority=TaskManager.priorities.CRITICAL,
+            name="BOOT.update",
+        )
+
+    def isFinished(self, name):
+        stage = self.stages.get(name)
+        return stage is not None and stage.finished is not None
+
+    def whenReady(self, name, callback):
+        """
+        Runs callback now if the stage has finished, otherwise right after it.
+        """
+        if self.isFinished(name) or name not in self.stages:
+            callback()
+        else:
+            self.waiting.setdefault(name, []).append(callback)
+
+    def advance(self):
+        progressed = True
+        while progressed:
+            progressed = False
+            for stage in self.stages.values():
+                if stage.started is None and all(
+                    self.isFinished(dep) for dep in stage.after
+                ):
+                    self._begin(stage)
+                    progressed = True
+                if (
+                    stage.started is not None
+                    and stage.finished is None
+                    and len(stage.textures) == len(stage.texturePaths)
+                ):
+                    self._finish(stage)
+                    progressed = True
+
+    def _begin(self, stage: "BOOT.Stage"):
+        stage.started = time.perf_counter()
+
+    def _prefetch(self, stage: "BOOT.Stage"):
+        for path in stage.texturePaths:
+            VRAM.acquireTextureAsync(
+                path,
+                lambda tex, stage=stage, path=path: stage.textures.__setitem__(
+                    path, tex
+                ),
+                owner="GUI",
+            )
+
+    def _finish(self, stage: "BOOT.Stage"):
+        start = time.perf_counter()
+        stage.build(stage)
+        stage.finished = time.perf_counter()
+        stage.buildTime = stage.finished - start
+        for tex in stage.textures.values():
+            VRAM.release(tex, owner="GUI")
+        for callback in self.waiting.pop(stage.name, []):
+            callback()
+
+    def update(self):
+        if (
+            self.firstFrame is None
+            and self.firstFrameStage is not None
+            and self.isFinished(self.firstFrameStage)
+        ):
+            self.firstFrame = time.perf_counter()
+        self.advance()
+        if self.firstFrame is not None and all(
+            stage.finished is not None for stage in self.stages.values()
+        ):
+            self.interactive = time.perf_counter()
+            self.printReport()
+            return TaskManager.DONE
+
+    def report(self):
+        return {
+            "timeToFirstFrame": (
+                self.firstFrame - self.begin if self.firstFrame else None
+            ),
+            "timeToInteractive": (
+                self.interactive - self.begin if self.interactive else None
+            ),
+            "stages": {
+                name: {
+                    "start": stage.started - self.begin if stage.started else None,
+                    "duration": stage.duration,
+                    "build": stage.buildTime,
+                }
+                for name, stage in self.stages.items()
+            },
+        }
+
+    def printReport(self):
+        report = self.report()
+        print("Boot report:")
+        for name, stage in report["stages"].items():
+            print(
+                f"  {name:<12} start {stage['start'] * 1000:8.1f} ms"
+                f"  took {stage['duration'] * 1000:8.1f} ms"
+                f"  (build {stage['build'] * 1000:.1f} ms)"
+            )
+        print(f"  time to first frame {report['timeToFirstFrame'] * 1000:.1f} ms")
+        print(f"  time to interactive {report['timeToInteractive'] * 1000:.1f} ms")
+
+
+BOOT = BOOT()
+
+
+class HIBERNATE:
+    """
+    Saves the desktop session (running programs, their windows in stacking
+    order and per-app state) to a compact binary image and restores it after
+    the next successful login.
+    """
+
+    PATH = "./HYBERFIL.session"
+    MAGIC = b"HIBR"
+    VERSION = 2
+    HEADER = struct.Struct("<4sHIId")
+
+    def __init__(self):
+        self.saved = False
+        self.restoredZ: dict[int, int] = {}
+        self.stats = {"restoreTime": None, "desktopTime": None}
+
+    def capture(self):
+        """
+        Builds the session image. Windows are listed bottom to top; each one
+        records the index of its owning program, or -1 for a bare API window,
+        and its per-owner key.
+        """
+        programs = []
+        owners = {}
+        for program in TASKBAR.getPrograms():
+            for instance in program.instances:
+                if not instance.alive or not any(
+                    window.winType != API.winTypes.SYSTEM for window in instance.windows
+                ):
+                    continue
+                owners[instance] = len(programs)
+                programs.append(
+                    (program.path, program.programData, instance.hibernateState())
+                )
+
+        windows = []
+        window = API.WindowStack.bottom
+        while window is not None:
+            if window.winType != API.winTypes.SYSTEM and not window.root.isEmpty():
+                windows.append(
+                    (
+                        owners.get(window.owner, -1),
+                        window.key[0],
+                        window.key[1],
+                        tuple(window.position),
+                        tuple(window.size),
+                        window.winType,
+                        tuple(window.frameColor),
+                        (
+                            window.contentText.getText()
+                            if window.contentText is not None
+                            else None
+                        ),
+                    )
+                )
+            window = window.zNext
+
+        return {"programs": programs, "windows": windows}
+
+    def save(self):
+        session = self.capture()
+        payload = zlib.compress(marshal.dumps(session))
+        header = self.HEADER.pack(
+            self.MAGIC, self.VERSION, zlib.crc32(payload), len(payload), time.time()
+        )
+        temp = self.PATH + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(header + payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.PATH)
+        self.saved = True
+        print(
+            f"Hibernated {len(session['programs'])} programs and "
+            f"{len(session['windows'])} windows ({len(header) + len(payload)} bytes)"
+        )
+
+    def load(self):
+        """
+        Reads the session image. Returns None if there is none or it fails
+        validation. A valid image stays on disk until discard() is called
+        after it has been restored.
+        """
+        try:
+            with open(self.PATH, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            magic, version, crc, length, _ = self.HEADER.unpack_from(data)
+            payload = data[self.HEADER.size : self.HEADER.size + length]
+            if (
+                magic != self.MAGIC
+                or version != self.VERSION
+                or len(payload) != length
+                or zlib.crc32(payload) != crc
+            ):
+                raise ValueError("bad header or checksum")
+            return marshal.loads(zlib.decompress(payload))
+        except Exception as e:
+            print("Discarded hibernation image: ", e)
+            self.discard()
+            return None
+
+    def discard(self):
+        try:
+            os.remove(self.PATH)
+        except FileNotFoundError:
+            pass
+
+    def applyWindow(self, window: "API.Window", zSort, record):
+        _, _, _, position, size, _, _, text = record
+        window.setGeometry(position=position, size=size)
+        if text is not None:
+            window.setText(text)
+        self.restoredZ[window.id] = zSort
+        if API.WindowStack.batchDepth == 0:
+            self.restack()
+
+    def restack(self):
+        """
+        Puts every restored window that is still open back into its saved
+        stacking order.
+        """
+        windows = [
+            window
+            for window in map(API.WindowStack.getWindow, self.restoredZ)
+            if window is not None
+        ]
+        windows.sort(key=lambda window: self.restoredZ[window.id])
+        API.WindowStack.restack(windows)
+
+    def restore(self, session):
+        """
+        Relaunches the saved programs and recreates bare windows inside one
+        WindowStack batch, then restacks them in saved order in a single
+        pass. Saved windows are matched to the relaunched ones by key.
+        Windows of out-of-process programs arrive later and are matched and
+        restacked as they are created.
+        """
+        start = time.perf_counter()
+        records: dict[int, dict] = {}
+        for zSort, record in enumerate(session["windows"], 1):
+            records.setdefault(record[0], {})[(record[1], record[2])] = (
+                zSort,
+                record,
+            )
+        programs = {program.path: program for program in TASKBAR.getPrograms()}
+
+        with API.WindowStack.batch():
+            for index, (path, programData, state) in enumerate(session["programs"]):
+                program = programs.get(path)
+                if program is None:
+                    try:
+                        program = PROGRAM(path)
+                    except FileNotFoundError:
+                        continue
+                program.programData = programData
+                instance = program.run(resumeState=state)
+                saved = records.get(index, {})
+                if instance.worker is not None:
+                    instance.pendingRestore.update(saved)
+                    continue
+                for window in list(instance.windows):
+                    if window.key in saved:
+                        self.applyWindow(window, *saved[window.key])
+            for zSort, record in records.get(-1, {}).values():
+                _, name, _, position, size, winType, frameColor, _ = record
+                window = API.Window(name, position, size, frameColor, winType)
+                self.applyWindow(window, zSort, record)
+        self.restack()
+
+        self.stats["restoreTime"] = time.perf_counter() - start
+        self.discard()
+
+    def desktopReady(self):
+        """
+        Records the time from process start to the first interactive desktop.
+        A desktop reached without a restore is a cold boot, which resumed
+        sessions are reported against; both include the time spent at the
+        lock and login screens.
+        """
+        if self.stats["desktopTime"] is not None:
+            return
+        self.stats["desktopTime"] = time.perf_counter() - BOOT.begin
+        desktopMs = self.stats["desktopTime"] * 1000
+        config = dict(GLOBALMEM.get("HIBERNATE", DEFAULTS["HIBERNATE"]))
+        if self.stats["restoreTime"] is None:
+            config["COLD_BOOT_MS"] = desktopMs
+            GLOBALMEM["HIBERNATE"] = config
+            return
+        coldBoot = config.get("COLD_BOOT_MS")
+        print(
+            f"Resumed to desktop in {desktopMs:.1f} ms, restore took "
+            f"{self.stats['restoreTime'] * 1000:.1f} ms"
+            + (f" (cold boot {coldBoot:.1f} ms)" if coldBoot is not None else "")
+        )
+
+
+HIBERNATE = HIBERNATE()
+
+
 class GUI:
-    def setTimeNodes(self, task):
+    def setTimeNodes(self):
+        if not UIManager.isLoaded("lockScreen") or not self.lockScreenWindow.visible:
+            return
         self.lockScreenTimeNode.setText(time.strftime("%I:%M:%S").lstrip("0"))
         self.lockScreenDateNode.setText(time.strftime("%A, %B %Y"))
-        return task.cont
 
     def setEntryFocus(self, entry):
         entry["focus"] = 1
@@ -666,145 +4487,249 @@ class GUI:
     def login(self, username, password):
         result = AUTH.login(username, password)
         if result == _state.PASS:
-            UIManager.fadeToPage("home", 0.35)
+            BOOT.whenReady("home", self.enterDesktop)
+
+    def enterDesktop(self):
+        UIManager.fadeToPage("home", 0.35)
+        if TASKBAR.parent is None:
             TASKBAR.load(self.homeScreen)
-            self.win11StartupSound.play()
+            BOOT.whenReady("sound", self.win11StartupSound.play)
+        if self.resumeSession is not None:
+            session, self.resumeSession = self.resumeSession, None
+            HIBERNATE.restore(session)
+        HIBERNATE.desktopReady()
+
+    def hibernate(self):
+        if TASKBAR.parent is not None:
+            HIBERNATE.save()
+            self.base.userExit()
+
+    def lock(self):
+        if UIManager.activePage is not None and UIManager.activePage.name == "home":
+            if UIManager.isLoaded("login"):
+                for entry in [
+                    self.loginScreenUsernameEntry,
+                    self.loginScreenPasswordEntry,
+                ]:
+                    entry.enterText("")
+                    self.restoreDefaultTextOnFocusOut(entry)
+            UIManager.fadeToPage("lockScreen", 0.35)
+            UIManager.prefetchPage("login")
 
     def __init__(self, base: "OS"):
         self.base = base
         self.base.setBackgroundColor(0, 0, 0, 1)
         self.windows = []
-        self.lockScreenWindow = UIManager.Window("lockScreen", UIManager)
-        self.loginWindow = UIManager.Window("login", UIManager)
-        self.homeScreen = UIManager.Window("home", UIManager)
-        self.win11StartupSound = self.base.loader.loadSfx("./src/audio/startup.m4a")
+        UIManager.addPageFactory("lockScreen", self.buildLockScreen, unloadable=True)
+        UIManager.addPageFactory("login", self.buildLogin, unloadable=True)
+        UIManager.addPageFactory("home", self.buildHome)
+        self.resumeSession = HIBERNATE.load()
+
+        BOOT.addStage("font", self.buildFont)
+        self.bootToLockScreen()
+        TaskManager.addTask(
+            self.setTimeNodes,
+            priority=TaskManager.priorities.LOW,
+            rate=4,
+            wakes=False,
+        )
+        self.base.accept("control-l", self.lock)
+        self.base.accept("control-h", self.hibernate)
+
+    def bootToLockScreen(self):
+        BOOT.addStage(
+            "lockScreen",
+            lambda stage: UIManager.goToPage("lockScreen"),
+            after=["font"],
+            textures=["./src/img/lockBackground.jpg", "./src/img/wifi.png"],
+        )
+        BOOT.addStage(
+            "login",
+            lambda stage: UIManager.getPage("login"),
+            after=["lockScreen"],
+            textures=["./src/img/lockBackground_blr.jpg", "./src/img/profile.png"],
+        )
+        BOOT.addStage(
+            "home",
+            lambda stage: UIManager.getPage("home"),
+            after=["lockScreen"],
+            textures=["./src/img/windows11background.png"],
+        )
+        BOOT.addStage("sound", self.buildSound, after=["lockScreen"])
+        BOOT.start(firstFrame="lockScreen")
 
-        self.win11Font = self.base.loader.loadFont(
+    def buildFont(self, stage: "BOOT.Stage"):
+        self.win11Font = VRAM.acquireFont(
             "./src/fonts/SegoeUIVF.ttf",
+            owner="GUI",
             pixelsPerUnit=200,
         )
         VRAM["WIN11FONT"] = self.win11Font
-        self.lockScreenBackgroundButton = DirectButton(
-            image="./src/img/lockBackground.jpg",
-            image_scale=(1 * (1920 / 1080), 1, 1),
-            frameSize=(-1 * (1920 / 1080), 1 * (1920 / 1080), -1, 1),
-            parent=self.lockScreenWindow.root,
-            relief=None,
-            geom=None,
-            command=lambda: [
-                UIManager.fadeToPage("login", 0.15),
-                self.setEntryFocus(self.loginScreenUsernameEntry),
-            ],
-            pressEffect=False,
+        GLYPHCACHE.configure()
+        GLYPHCACHE.attach("./src/fonts/SegoeUIVF.ttf", self.win11Font, 200)
+
+    def buildLockScreen(self):
+        self.lockScreenWindow = UIManager.Window("lockScreen", UIManager)
+        self.lockScreenBackgroundButton = self.lockScreenWindow.addWidget(
+            DirectButton(
+                image=self.lockScreenWindow.acquireTexture(
+                    "./src/img/lockBackground.jpg"
+                ),
+                image_scale=(1 * (1920 / 1080), 1, 1),
+                frameSize=(-1 * (1920 / 1080), 1 * (1920 / 1080), -1, 1),
+                parent=self.lockScreenWindow.root,
+                relief=None,
+                geom=None,
+                command=lambda: BOOT.whenReady(
+                    "login",
+                    lambda: [
+                        UIManager.fadeToPage("login", 0.15),
+                        self.setEntryFocus(self.loginScreenUsernameEntry),
+                    ],
+                ),
+                pressEffect=False,
+            )
         )
         self.lockScreenBackgroundButton.setTransparency(TransparencyAttrib.MAlpha)
-        self.lockScreenTimeNode = OnscreenText(
-            text=time.strftime("%I:%M:%S").lstrip("0"),
-            font=self.win11Font,
-            fg=(1, 1, 1, 1),
-            pos=(0, 0.45),
-            scale=0.2,
-            mayChange=True,
-            parent=self.lockScreenWindow.root,
-        )
-        self.lockScreenDateNode = OnscreenText(
-            text=time.strftime("%A, %B %Y"),
-            font=self.win11Font,
-            fg=(1, 1, 1, 1),
-            pos=(0, 0.35),
-            scale=0.045,
-            mayChange=True,
-            parent=self.lockScreenWindow.root,
+        self.lockScreenTimeNode = self.lockScreenWindow.addWidget(
+            OnscreenText(
+                text=time.strftime("%I:%M:%S").lstrip("0"),
+                font=GLYPHCACHE.fontFor("0123456789:", self.win11Font),
+                fg=(1, 1, 1, 1),
+                pos=(0, 0.45),
+                scale=0.2,
+                mayChange=True,
+                parent=self.lockScreenWindow.root,
+            )
         )
-        self.lockScreenWifiImage = OnscreenImage(
-            image="./src/img/wifi.png",
-            scale=(0.025 * (1280 / 942), 0.025, 0.025),
-            pos=(1.5, 0, -0.9),
-            parent=self.lockScreenWindow.root,
+        self.lockScreenDateNode = self.lockScreenWindow.addWidget(
+            OnscreenText(
+                text=time.strftime("%A, %B %Y"),
+                font=GLYPHCACHE.fontFor(time.strftime("%A, %B %Y"), self.win11Font),
+                fg=(1, 1, 1, 1),
+                pos=(0, 0.35),
+                scale=0.045,
+                mayChange=True,
+                parent=self.lockScreenWindow.root,
+            )
+        )
+        self.lockScreenWifiImage = self.lockScreenWindow.addWidget(
+            OnscreenImage(
+                image=self.lockScreenWindow.acquireTexture("./src/img/wifi.png"),
+                scale=(0.025 * (1280 / 942), 0.025, 0.025),
+                pos=(1.5, 0, -0.9),
+                parent=self.lockScreenWindow.root,
+            )
         )
         self.lockScreenWifiImage.setTransparency(TransparencyAttrib.MAlpha)
 
-        self.loginScreenBackgroundImage = DirectButton(
-            image="./src/img/lockBackground_blr.jpg",
-            scale=(1 * (1920 / 1080), 1, 1),
-            parent=self.loginWindow.root,
-            relief=None,
-            geom=None,
-            command=lambda: [
-                self.restoreDefaultTextOnFocusOut(self.loginScreenPasswordEntry),
-                self.restoreDefaultTextOnFocusOut(self.loginScreenUsernameEntry),
-            ],
-            pressEffect=False,
+    def buildLogin(self):
+        self.loginWindow = UIManager.Window("login", UIManager)
+        self.loginScreenBackgroundImage = self.loginWindow.addWidget(
+            DirectButton(
+                image=self.loginWindow.acquireTexture(
+                    "./src/img/lockBackground_blr.jpg"
+                ),
+                scale=(1 * (1920 / 1080), 1, 1),
+                parent=self.loginWindow.root,
+                relief=None,
+                geom=None,
+                command=lambda: [
+                    self.restoreDefaultTextOnFocusOut(self.loginScreenPasswordEntry),
+                    self.restoreDefaultTextOnFocusOut(self.loginScreenUsernameEntry),
+                ],
+                pressEffect=False,
+            )
         )
         self.loginScreenBackgroundImage.setTransparency(TransparencyAttrib.MAlpha)
 
-        self.loginScreenUsernameProfileImage = OnscreenImage(
-            image="./src/img/profile.png",
-            scale=(0.2, 0.2, 0.2),
-            pos=(0, 0, 0.35),
-            parent=self.loginWindow.root,
+        self.loginScreenUsernameProfileImage = self.loginWindow.addWidget(
+            OnscreenImage(
+                image=self.loginWindow.acquireTexture("./src/img/profile.png"),
+                scale=(0.2, 0.2, 0.2),
+                pos=(0, 0, 0.35),
+                parent=self.loginWindow.root,
+            )
         )
         self.loginScreenUsernameProfileImage.setTransparency(TransparencyAttrib.MAlpha)
 
-        self.loginScreenUsernameEntry = DirectEntry(
-            text="",
-            scale=0.05,
-            initialText="Username",
-            numLines=1,
-            focus=0,
-            parent=self.loginWindow.root,
-            pos=(0, 0, 0),
-            frameColor=(0.5, 0.5, 0.5, 0.5),
-            text_fg=(1, 1, 1, 1),
-            text_font=self.win11Font,
-            text_align=TextNode.ACenter,
-            relief=DGG.FLAT,
-            command=lambda t: self.setEntryFocus(self.loginScreenPasswordEntry),
+        self.loginScreenUsernameEntry = self.loginWindow.addWidget(
+            DirectEntry(
+                text="",
+                scale=0.05,
+                initialText="Username",
+                numLines=1,
+                focus=0,
+                parent=self.loginWindow.root,
+                pos=(0, 0, 0),
+                frameColor=(0.5, 0.5, 0.5, 0.5),
+                text_fg=(1, 1, 1, 1),
+                text_font=self.win11Font,
+                text_align=TextNode.ACenter,
+                relief=DGG.FLAT,
+                command=lambda t: self.setEntryFocus(self.loginScreenPasswordEntry),
+            )
         )
         self.loginScreenUsernameEntry.bind(
             DGG.B1PRESS, lambda _: self.clearTextOnFocus(self.loginScreenUsernameEntry)
         )
         self.loginScreenUsernameEntry.setTransparency(TransparencyAttrib.MAlpha)
 
-        self.loginScreenPasswordEntry = DirectEntry(
-            text="",
-            scale=0.05,
-            initialText="Password",
-            numLines=1,
-            focus=0,
-            parent=self.loginWindow.root,
-            pos=(0, 0, -0.15),
-            frameColor=(0.5, 0.5, 0.5, 0.5),
-            text_fg=(1, 1, 1, 1),
-            text_font=self.win11Font,
-            text_align=TextNode.ACenter,
-            relief=DGG.FLAT,
-            obscured=True,
-            command=lambda t: [
-                self.login(
-                    self.loginScreenUsernameEntry.get(),
-                    self.loginScreenPasswordEntry.get(),
-                ),
-            ],
+        self.loginScreenPasswordEntry = self.loginWindow.addWidget(
+            DirectEntry(
+                text="",
+                scale=0.05,
+                initialText="Password",
+                numLines=1,
+                focus=0,
+                parent=self.loginWindow.root,
+                pos=(0, 0, -0.15),
+                frameColor=(0.5, 0.5, 0.5, 0.5),
+                text_fg=(1, 1, 1, 1),
+                text_font=self.win11Font,
+                text_align=TextNode.ACenter,
+                relief=DGG.FLAT,
+                obscured=True,
+                command=lambda t: [
+                    self.login(
+                        self.loginScreenUsernameEntry.get(),
+                        self.loginScreenPasswordEntry.get(),
+                    ),
+                ],
+            )
         )
         self.loginScreenPasswordEntry.bind(
             DGG.B1PRESS, lambda _: self.clearTextOnFocus(self.loginScreenPasswordEntry)
         )
         self.loginScreenPasswordEntry.setTransparency(TransparencyAttrib.MAlpha)
 
-        self.homeScreenBackgroundImage = DirectButton(
-            image="./src/img/windows11background.png",
-            scale=(1 * (1920 / 1080), 1, 1),
-            parent=self.homeScreen.root,
-            relief=None,
-            geom=None,
-            pressEffect=False,
+    def buildHome(self):
+        self.homeScreen = UIManager.Window("home", UIManager)
+        self.homeScreenBackgroundImage = self.homeScreen.addWidget(
+            DirectButton(
+                image=self.homeScreen.acquireTexture(
+                    "./src/img/windows11background.png"
+                ),
+                scale=(1 * (1920 / 1080), 1, 1),
+                parent=self.homeScreen.root,
+                relief=None,
+                geom=None,
+                pressEffect=False,
+            )
         )
         self.homeScreenBackgroundImage.setTransparency(TransparencyAttrib.MAlpha)
         self.homeScreenBackgroundImage.setBin("background", 0)
+        videoPath = GLOBALMEM.get("VIDEO", DEFAULTS["VIDEO"]).get("BACKGROUND")
+        if videoPath and os.path.isfile(videoPath):
+            self.homeScreenVideo = self.homeScreen.addWidget(
+                UIManager.VideoPlayer("homeScreenVideo", videoPath, self.homeScreen)
+            )
+            self.homeScreenVideo.setLoop(True)
 
-        self.lockScreenWindow.show()
-        base.taskMgr.add(self.setTimeNodes, "setTimeNodes", delay=1)
+    def buildSound(self, stage: "BOOT.Stage"):
+        self.win11StartupSound = VRAM.acquireSound(
+            "./src/audio/startup.m4a", owner="GUI"
+        )
 
     def clearTextOnFocus(self, entry: DirectEntry):
         if entry.get() in ["Password", "Username"]:
@@ -827,51 +4752,193 @@ class GUI:
 
 
 class MouseOverManager:
-    def __init__(self):
-        self.elements = []
-        self.activeElements = []
+    def __init__(self, cellSize=0.1, revalidateBudget=8):
+        self.cellSize = cellSize
+        self.revalidateBudget = revalidateBudget
+        self.elements: dict[int, MouseOverManager.Entry] = {}
+        self.grid: dict[tuple, set] = {}
+        self.activeElements: set[int] = set()
+        self.lastMousePos = None
+        self.dirty = set()
+        self.sweepQueue = []
+        self.nextHandle = 0
+
+    class Entry:
+        __slots__ = (
+            "handle",
+            "element",
+            "hitbox_scale",
+            "callback",
+            "args",
+            "kwargs",
+            "key",
+            "hitbox",
+            "cells",
+        )
+
+        def __init__(self, handle, element, hitbox_scale, callback, args, kwargs):
+            self.handle = handle
+            self.element = element
+            self.hitbox_scale = hitbox_scale
+            self.callback = callback
+            self.args = args
+            self.kwargs = kwargs
+            self.key = None
+            self.hitbox = None
+            self.cells = ()
 
     def registerElement(self, element, hitbox_scale, callback, *args, **kwargs):
         """
         Registers an element with a callback to be triggered when the mouse is over the element.
         :param element: The NodePath or DirectGUI element to monitor.
         :param callback: The function to call when the mouse is over the element.
+        :return: A handle that can be passed to unregisterElement.
         """
-        self.elements.append((element, hitbox_scale, callback, args, kwargs))
+        self.nextHandle += 1
+        entry = MouseOverManager.Entry(
+            self.nextHandle, element, hitbox_scale, callback, args, kwargs
+        )
+        self.elements[entry.handle] = entry
+        self.dirty.add(entry.handle)
+        return entry.handle
+
+    def unregisterElement(self, handle):
+        """
+        Removes a registered element. Accepts either the handle returned by
+        registerElement or the element itself.
+        """
+        if handle not in self.elements:
+            for entry in self.elements.values():
+                if entry.element is handle:
+                    handle = entry.handle
+                    break
+            else:
+                return
+        entry = self.elements.pop(handle)
+        self._unindex(entry)
+        self.activeElements.discard(handle)
+        self.dirty.discard(handle)
+
+    def markDirty(self, element=None):
+        """
+        Forces the hitbox of an element (or of every element) to be recomputed
+        on the next update, e.g. after it was moved or shown/hidden.
+        """
+        if element is None:
+            self.dirty.update(self.elements)
+            return
+        if isinstance(element, int):
+            if element in self.elements:
+                self.dirty.add(element)
+            return
+        for entry in self.elements.values():
+            if entry.handle == element or entry.element is element:
+                self.dirty.add(entry.handle)
+
+    def _cellRange(self, hitbox):
+        xmin, xmax, ymin, ymax = hitbox
+        cs = self.cellSize
+        return [
+            (cx, cy)
+            for cx in range(int(xmin // cs), int(xmax // cs) + 1)
+            for cy in range(int(ymin // cs), int(ymax // cs) + 1)
+        ]
+
+    def _unindex(self, entry):
+        for cell in entry.cells:
+            bucket = self.grid.get(cell)
+            if bucket is not None:
+                bucket.discard(entry.handle)
+                if not bucket:
+                    del self.grid[cell]
+        entry.cells = ()
+
+    def _refresh(self, entry) -> bool:
+        """
+        Re-reads the transform of an entry and re-indexes it only if the
+        transform or bounds changed. Returns False if the element is gone.
+        """
+        element = entry.element
+        if not element or element.isEmpty():
+            self.unregisterElement(entry.handle)
+            return False
+        transform = element.getTransform(base.render2d)
+        bounds = tuple(element.getBounds())
+        key = (transform, bounds)
+        if entry.key is not None and (
+            entry.key[1] == bounds and entry.key[0].compareTo(transform) == 0
+        ):
+            return True
+        entry.key = key
+        xmin, xmax, ymin, ymax = bounds
+        pos = transform.getPos()
+        scale = element.getScale()
+        hitbox = (
+            xmin * scale[0] * entry.hitbox_scale[0] + pos[0],
+            xmax * scale[0] * entry.hitbox_scale[0] + pos[0],
+            ymin * scale[2] * entry.hitbox_scale[1] + pos[2],
+            ymax * scale[2] * entry.hitbox_scale[1] + pos[2],
+        )
+        if hitbox != entry.hitbox:
+            self._unindex(entry)
+            entry.hitbox = hitbox
+            entry.cells = tuple(self._cellRange(hitbox))
+            for cell in entry.cells:
+                self.grid.setdefault(cell, set()).add(entry.handle)
+        return True
+
+    def _sweep(self):
+        """
+        Revalidates a small, fixed number of entries per moving frame so that
+        elements moved without markDirty are eventually re-indexed.
+        """
+        for _ in range(min(self.revalidateBudget, len(self.elements))):
+            if not self.sweepQueue:
+                self.sweepQueue = list(self.elements)
+            handle = self.sweepQueue.pop()
+            entry = self.elements.get(handle)
+            if entry is not None:
+                self._refresh(entry)
 
     def update(self):
         """
         Checks if the mouse is over any registered elements and triggers the corresponding callbacks.
+        Only the elements in the grid cell under the cursor (plus the ones currently hovered) are tested,
+        and nothing is done on frames where the mouse did not move.
         """
-        if base.mouseWatcherNode.hasMouse():
-            mouse_pos = base.mouseWatcherNode.getMouse()
-            for element, hitbox_scale, callback, args, kwargs in self.elements:
-                if not element or element.isEmpty() or element.isHidden():
-                    continue
-                bounds = element.getBounds()
-                xmin, xmax, ymin, ymax = bounds
-                transform = element.getTransform(base.render2d)
-                pos: tuple[3] = transform.getPos()
-                scale: tuple[3] = element.getScale()
-                xmin *= scale[0] * hitbox_scale[0]
-                xmax *= scale[0] * hitbox_scale[0]
-                ymin *= scale[2] * hitbox_scale[1]
-                ymax *= scale[2] * hitbox_scale[1]
-
-                xmin += pos[0]
-                xmax += pos[0]
-                ymin += pos[2]
-                ymax += pos[2]
-
-                bounds = (xmin, xmax, ymin, ymax)
-                if xmin <= mouse_pos.x <= xmax and ymin <= mouse_pos.y <= ymax:
-                    if element not in self.activeElements:
-                        self.activeElements.append(element)
-                        callback(True, *args, **kwargs)
-                else:
-                    if element in self.activeElements:
-                        self.activeElements.remove(element)
-                        callback(False, *args, **kwargs)
+        if not base.mouseWatcherNode.hasMouse():
+            return
+        mouse_pos = base.mouseWatcherNode.getMouse()
+        mx, my = mouse_pos.x, mouse_pos.y
+        if (mx, my) == self.lastMousePos and not self.dirty:
+            return
+        self.lastMousePos = (mx, my)
+
+        for handle in list(self.dirty):
+            entry = self.elements.get(handle)
+            if entry is not None:
+                self._refresh(entry)
+        self.dirty.clear()
+        self._sweep()
+
+        cell = (int(mx // self.cellSize), int(my // self.cellSize))
+        candidates = self.grid.get(cell, set()) | self.activeElements
+        for handle in list(candidates):
+            entry = self.elements.get(handle)
+            if entry is None or not self._refresh(entry):
+                continue
+            if entry.element.isHidden():
+                hovered = False
+            else:
+                xmin, xmax, ymin, ymax = entry.hitbox
+                hovered = xmin <= mx <= xmax and ymin <= my <= ymax
+            if hovered:
+                if handle not in self.activeElements:
+                    self.activeElements.add(handle)
+                    entry.callback(True, *entry.args, **entry.kwargs)
+            elif handle in self.activeElements:
+                self.activeElements.discard(handle)
+                entry.callback(False, *entry.args, **entry.kwargs)
 
 
 MouseOverManager = MouseOverManager()
@@ -882,9 +4949,20 @@ class OS(ShowBase):
         super().__init__()
         VRAM["OS"] = self
         VRAM["LOADER"] = self.loader
+        VRAM.configure()
+        VFS.mount()
+        SEARCH.indexSettings()
         self.gui = GUI(self)
         self.taskMgr.add(TaskManager.update, "TaskManager")  # type: ignore
-        TaskManager.addTask(task=MouseOverManager.update)
+        TaskManager.addTask(
+            MouseOverManager.update,
+            priority=TaskManager.priorities.HIGH,
+            rate=60,
+            wakes=False,
+        )
+        PROFILER.attach(self)
+        API.Compositor.attach(self)
+        FRAMEPACER.attach(self)
 
 
 FILEMGR.loadPrefs()
@@ -894,7 +4972,26 @@ exec(GLOBALMEM["PANDAPRC"]["STARTUP_INJECTOR"])
 
 
 def exit_handler():
-    FILEMGR.savePrefs()
+    if (
+        GLOBALMEM.get("HIBERNATE", DEFAULTS["HIBERNATE"]).get("ON_EXIT", False)
+        and not HIBERNATE.saved
+        and TASKBAR.parent is not None
+    ):
+        HIBERNATE.save()
+    FILEMGR.shutdown()
+    VFS.unmount()
+    PROFILER.dump()
+    WORKERPOOL.shutdown()
+    print("Program code cache:", CODECACHE.stats)
+    print("Glyph cache:", GLYPHCACHE.stats)
+    if SEARCH.stats["queries"]:
+        print(
+            f"Search: {SEARCH.stats['queries']} queries, slowest "
+            f"{SEARCH.stats['slowest'] * 1000:.3f} ms"
+        )
+    print("VRAM resident bytes:", VRAM.resident, VRAM.report()["owners"])
+    if FRAMEPACER.enabled:
+        print("Frame pacing (seconds per mode):", FRAMEPACER.report())
 
 
 atexit.register(exit_handler)
@@ -0,0 +1,195 @@
+"""
+Worker process used by WORKERPOOL in main.py to run programs outside of the
+render process. A worker runs one program at a time and then waits for the
+next, so the pool reuses it. Messages in both directions are length-prefixed
+marshal payloads on stdin/stdout; the program's own prints go to stderr.
+
+render -> worker: ("run", name, code) | ("closed", wid) | ("stop",)
+worker -> render: [("create", wid, kwargs), ("move", wid, x, y),
+                   ("setText", wid, text), ("close", wid), ...] | ("done",)
+
+"stop" ends the current program; closing stdin ends the worker.
+"""
+
+import marshal
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+
+HEADER = struct.Struct("<I")
+
+
+def readMessage(stream):
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    (length,) = HEADER.unpack(header)
+    return marshal.loads(stream.read(length))
+
+
+def writeMessage(stream, message):
+    data = marshal.dumps(message)
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+class RemoteWindow:
+    def __init__(self, host: "Host", wid, kwargs):
+        self.host = host
+        self.id = wid
+        self.name = kwargs["name"]
+        self.position = kwargs["position"]
+        self.size = kwargs["size"]
+        self.closed = False
+        host.send(("create", wid, kwargs))
+
+    def setGeometry(self, position: tuple = None, size: tuple = None):
+        if position is not None:
+            self.move(*position)
+
+    def move(self, x, y):
+        self.position = (x, y)
+        self.host.send(("move", self.id, x, y))
+
+    def setText(self, text):
+        self.host.send(("setText", self.id, str(text)))
+
+    def destroy(self):
+        if not self.closed:
+            self.closed = True
+            self.host.send(("close", self.id))
+            self.host.windowClosed(self)
+
+
+class RemoteAPI:
+    class winTypes:
+        SYSTEM = "SYSTEM"
+        APPLICATION = "APPLICATION"
+        DIALOG = "DIALOG"
+        POPUP = "POPUP"
+        WIDGET = "WIDGET"
+
+    def __init__(self, host: "Host"):
+        self.host = host
+
+    def Window(
+        self,
+        name: str,
+        position: tuple = (0, 0),
+        size: tuple = (500, 300),
+        frameColor=(1, 1, 1, 1),
+        winType: str = None,
+    ):
+        self.host.nextId += 1
+        window = RemoteWindow(
+            self.host,
+            self.host.nextId,
+            {
+                "name": name,
+                "position": tuple(position),
+                "size": tuple(size),
+                "frameColor": tuple(frameColor),
+                "winType": winType,
+            },
+        )
+        self.host.windows[window.id] = window
+        return window
+
+
+class Host:
+    FLUSH_INTERVAL = 1 / 60
+
+    def __init__(self, inStream, outStream):
+        self.inStream = inStream
+        self.outStream = outStream
+        self.outLock = threading.Lock()
+        self.pending = []
+        self.pendingLock = threading.Lock()
+        self.windows: dict[int, RemoteWindow] = {}
+        self.nextId = 0
+        self.finished = threading.Event()
+        self.runs = queue.SimpleQueue()
+
+    def send(self, op):
+        with self.pendingLock:
+            self.pending.append(op)
+
+    def flush(self):
+        with self.pendingLock:
+            batch, self.pending = self.pending, []
+        if batch:
+            with self.outLock:
+                writeMessage(self.outStream, batch)
+
+    def flush_loop(self):
+        while True:
+            time.sleep(self.FLUSH_INTERVAL)
+            self.flush()
+
+    def windowClosed(self, window: RemoteWindow):
+        self.windows.pop(window.id, None)
+        if not self.windows:
+            self.finished.set()
+
+    def read_loop(self):
+        while True:
+            message = readMessage(self.inStream)
+            if message is None:
+                self.finished.set()
+                self.runs.put(None)
+                return
+            if message[0] == "run":
+                self.runs.put(message)
+            elif message[0] == "stop":
+                # The render side has already dropped these windows; marking
+                # them closed lets cooperative program loops return.
+                for window in list(self.windows.values()):
+                    window.closed = True
+                self.finished.set()
+            elif message[0] == "closed":
+                window = self.windows.get(message[1])
+                if window is not None:
+                    window.closed = True
+                    self.windowClosed(window)
+
+    def run(self, name, code):
+        self.windows.clear()
+        self.finished.clear()
+        namespace = {
+            "__name__": f"prgm_{name}",
+            "__builtins__": __builtins__,
+            "API": RemoteAPI(self),
+        }
+        try:
+            exec(marshal.loads(code), namespace)
+        except Exception as e:
+            print(f"Program '{name}' crashed: ", e, file=sys.stderr)
+        else:
+            self.flush()
+            if self.windows:
+                self.finished.wait()
+        for window in list(self.windows.values()):
+            window.destroy()
+        self.flush()
+        with self.outLock:
+            writeMessage(self.outStream, ("done",))
+
+    def serve(self):
+        threading.Thread(target=self.flush_loop, daemon=True).start()
+        threading.Thread(target=self.read_loop, daemon=True).start()
+        while True:
+            message = self.runs.get()
+            if message is None:
+                return
+            _, name, code = message
+            self.run(name, code)
+
+
+if __name__ == "__main__":
+    protocolOut = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    Host(sys.stdin.buffer, protocolOut).serve()
+    os._exit(0)
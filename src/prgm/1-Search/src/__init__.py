@@ -0,0 +1,99 @@
+from direct.gui.DirectGui import *
+from panda3d.core import TextNode
+
+if "a" == "b":
+    from main import *
+
+ROWS = 8
+ROW_HEIGHT = 0.075
+
+window = API.Window(
+    name="Search",
+    position=(-0.4, 0.2),
+    size=(480, 360),
+    frameColor=(0.97, 0.97, 0.97, 1),
+)
+xmin, xmax, ymin, ymax = window.getFrameSize()
+state = {"query": None, "results": []}
+
+entry = DirectEntry(
+    parent=window.root,
+    text="",
+    scale=0.045,
+    width=(xmax - xmin - 0.06) / 0.045,
+    numLines=1,
+    focus=1,
+    pos=(xmin + 0.03, 0, ymax - 0.15),
+    frameColor=(1, 1, 1, 1),
+    text_align=TextNode.ALeft,
+    relief=DGG.FLAT,
+)
+statusLabel = DirectLabel(
+    parent=window.root,
+    text="",
+    text_scale=0.035,
+    text_align=TextNode.ALeft,
+    text_fg=(0.4, 0.4, 0.4, 1),
+    pos=(xmin + 0.03, 0, ymin + 0.025),
+    frameColor=(0, 0, 0, 0),
+)
+
+
+def activate(index):
+    if index >= len(state["results"]):
+        return
+    result = state["results"][index]
+    if result.kind == "program":
+        result.target.run()
+    elif result.kind == "window":
+        API.WindowStack.focusWindow(result.target.id)
+    else:
+        statusLabel["text"] = f"{result.title} = {result.subtitle}"
+        window.markDirty()
+
+
+rows = []
+for index in range(ROWS):
+    row = DirectButton(
+        parent=window.root,
+        text="",
+        text_scale=0.04,
+        text_align=TextNode.ALeft,
+        text_pos=(0.02, -0.012),
+        frameSize=(0, xmax - xmin - 0.06, -ROW_HEIGHT / 2, ROW_HEIGHT / 2),
+        frameColor=(0, 0, 0, 0),
+        relief=DGG.FLAT,
+        pos=(xmin + 0.03, 0, ymax - 0.26 - index * ROW_HEIGHT),
+        command=activate,
+        extraArgs=[index],
+    )
+    rows.append(row)
+
+
+def poll():
+    """
+    Runs the query whenever the entry text changes, so every keystroke is
+    answered from the index.
+    """
+    query = entry.get()
+    if query == state["query"]:
+        return
+    state["query"] = query
+    state["results"] = API.Search.search(query, ROWS) if query.strip() else []
+    for index, row in enumerate(rows):
+        if index < len(state["results"]):
+            result = state["results"][index]
+            row["text"] = f"{result.title}  -  {result.kind}: {result.subtitle}"[:70]
+            row.show()
+        else:
+            row.hide()
+    statusLabel["text"] = (
+        f"{len(state['results'])} results in {API.Search.lastQueryTime * 1000:.2f} ms"
+        if query.strip()
+        else "Search programs, windows and settings"
+    )
+    window.markDirty()
+
+
+API.addTask(poll, rate=30, wakes=False)
+poll()
@@ -0,0 +1,132 @@
+from direct.gui.DirectGui import *
+from panda3d.core import TextNode
+
+if "a" == "b":
+    from main import *
+
+ROWS = 16
+ROW_HEIGHT = 0.05
+
+window = API.Window(
+    name="Explorer",
+    position=(0.2, 0.05),
+    size=(520, 440),
+    frameColor=(0.96, 0.96, 0.96, 1),
+)
+xmin, xmax, ymin, ymax = window.getFrameSize()
+state = dict(RESUME) if RESUME else {"path": "/", "first": 0}
+if not API.VFS.isdir(state["path"]):
+    state = {"path": "/", "first": 0}
+
+pathLabel = DirectLabel(
+    parent=window.root,
+    text="",
+    text_scale=0.04,
+    text_align=TextNode.ALeft,
+    pos=(xmin + 0.13, 0, ymax - 0.12),
+    frameColor=(0, 0, 0, 0),
+)
+countLabel = DirectLabel(
+    parent=window.root,
+    text="",
+    text_scale=0.035,
+    text_align=TextNode.ALeft,
+    text_fg=(0.4, 0.4, 0.4, 1),
+    pos=(xmin + 0.03, 0, ymin + 0.025),
+    frameColor=(0, 0, 0, 0),
+)
+
+
+def render():
+    """
+    Only ROWS buttons exist; scrolling rebinds them to a different slice of
+    the cached directory listing.
+    """
+    path = state["path"]
+    total = API.VFS.count(path)
+    state["first"] = max(0, min(state["first"], total - ROWS))
+    names = API.VFS.listdir(path, state["first"], ROWS)
+    for index, row in enumerate(rows):
+        if index < len(names):
+            name = names[index]
+            isDir = API.VFS.isdir(API.VFS.join(path, name))
+            row["text"] = name + ("/" if isDir else "")
+            row.show()
+        else:
+            row.hide()
+    pathLabel["text"] = path
+    last = min(total, state["first"] + ROWS)
+    countLabel["text"] = f"{total} items ({state['first'] + 1 if total else 0}-{last})"
+    window.markDirty()
+
+
+def openRow(index):
+    names = API.VFS.listdir(state["path"], state["first"] + index, 1)
+    if not names:
+        return
+    target = API.VFS.join(state["path"], names[0])
+    if API.VFS.isdir(target):
+        state["path"] = target
+        state["first"] = 0
+        render()
+
+
+def goUp():
+    if state["path"] != "/":
+        state["path"] = API.VFS.join(state["path"], "..")
+        state["first"] = 0
+        render()
+
+
+def scroll(delta):
+    state["first"] += delta
+    render()
+
+
+def hibernate():
+    return dict(state)
+
+
+rows = []
+for index in range(ROWS):
+    row = DirectButton(
+        parent=window.root,
+        text="",
+        text_scale=0.038,
+        text_align=TextNode.ALeft,
+        text_pos=(0.02, -0.012),
+        frameSize=(0, xmax - xmin - 0.1, -ROW_HEIGHT / 2, ROW_HEIGHT / 2),
+        frameColor=(0, 0, 0, 0),
+        relief=DGG.FLAT,
+        pos=(xmin + 0.03, 0, ymax - 0.19 - index * ROW_HEIGHT),
+        command=openRow,
+        extraArgs=[index],
+    )
+    row.bind(DGG.WHEELUP, lambda _: scroll(-3))
+    row.bind(DGG.WHEELDOWN, lambda _: scroll(3))
+    rows.append(row)
+
+DirectButton(
+    parent=window.root,
+    text="Up",
+    text_scale=0.035,
+    frameSize=(-0.045, 0.045, -0.025, 0.03),
+    pos=(xmin + 0.07, 0, ymax - 0.12),
+    relief=DGG.FLAT,
+    frameColor=(0.85, 0.85, 0.85, 1),
+    command=goUp,
+)
+for label, delta, offset in [("^", -ROWS, 0.16), ("v", ROWS, 0.07)]:
+    DirectButton(
+        parent=window.root,
+        text=label,
+        text_scale=0.035,
+        frameSize=(-0.03, 0.03, -0.025, 0.03),
+        pos=(xmax - offset + 0.04, 0, ymin + 0.035),
+        relief=DGG.FLAT,
+        frameColor=(0.85, 0.85, 0.85, 1),
+        command=scroll,
+        extraArgs=[delta],
+    )
+
+render()
@@ -0,0 +1,37 @@
+import textwrap
+import time
+
+if "a" == "b":
+    from main import API
+
+# Runs in a WORKERPOOL process (runMode "process"), so the loop below never
+# blocks the render thread. Only the window ops of the remote API are used.
+
+GREETING = "Hi, I'm Copilot. Here's a tip:"
+TIPS = [
+    "Press Ctrl+L to lock the desktop.",
+    "Press Ctrl+H to hibernate; your windows come back after you log in.",
+    "Press F12 to show the profiler overlay.",
+    "Type 'help' in Terminal to list its commands.",
+    "Search finds programs, open windows and settings as you type.",
+]
+
+window = API.Window(
+    name="Copilot",
+    position=(0.55, 0.15),
+    size=(380, 200),
+    frameColor=(0.1, 0.1, 0.18, 1),
+)
+
+tip = 0
+while not window.closed:
+    text = textwrap.fill(TIPS[tip % len(TIPS)], 40)
+    for end in range(1, len(text) + 1):
+        if window.closed:
+            break
+        window.setText(f"{GREETING}\n\n{text[:end]}")
+        time.sleep(0.03)
+    deadline = time.monotonic() + 4
+    while not window.closed and time.monotonic() < deadline:
+        time.sleep(0.1)
+    tip += 1
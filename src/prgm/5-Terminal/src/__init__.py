@@ -1,11 +1,154 @@
 from direct.gui.DirectGui import *
+from panda3d.core import TextNode
+import shlex
 
 if "a" == "b":
     from main import *
 
+HISTORY = 200
+
 window = API.Window(
     name="Terminal",
     position=(0, 0),
     size=(420, 400),
     frameColor=(0, 0, 0, 1),
 )
+xmin, xmax, ymin, ymax = window.getFrameSize()
+state = dict(RESUME) if RESUME else {"cwd": "/", "output": []}
+if not API.VFS.isdir(state["cwd"]):
+    state["cwd"] = "/"
+screen = API.TextSurface(window, (xmin + 0.03, xmax - 0.03, ymin + 0.1, ymax - 0.1))
+window.root.bind(DGG.WHEELUP, lambda _: screen.scroll(3))
+window.root.bind(DGG.WHEELDOWN, lambda _: screen.scroll(-3))
+
+
+def echo(text=""):
+    screen.write(f"{text}\n")
+
+
+def resolve(path):
+    return API.VFS.join(state["cwd"], path)
+
+
+def cmd_help(args):
+    echo("help pwd cd ls cat mkdir touch write rm clear df seq")
+
+
+def cmd_pwd(args):
+    echo(state["cwd"])
+
+
+def cmd_cd(args):
+    target = resolve(args[0] if args else "/")
+    if not API.VFS.isdir(target):
+        echo(f"cd: no such directory: {target}")
+        return
+    state["cwd"] = target
+
+
+def cmd_ls(args):
+    target = resolve(args[0] if args else ".")
+    if not API.VFS.isdir(target):
+        echo(target if API.VFS.exists(target) else f"ls: not found: {target}")
+        return
+    for name in API.VFS.listdir(target):
+        isDir = API.VFS.isdir(API.VFS.join(target, name))
+        echo(name + ("/" if isDir else ""))
+
+
+def cmd_cat(args):
+    for path in args:
+        echo(API.VFS.readText(resolve(path)))
+
+
+def cmd_mkdir(args):
+    for path in args:
+        API.VFS.mkdir(resolve(path))
+
+
+def cmd_touch(args):
+    for path in args:
+        if not API.VFS.exists(resolve(path)):
+            API.VFS.write(resolve(path), b"")
+
+
+def cmd_write(args):
+    if not args:
+        echo("usage: write <file> <text...>")
+        return
+    API.VFS.write(resolve(args[0]), " ".join(args[1:]) + "\n")
+
+
+def cmd_rm(args):
+    recursive = "-r" in args
+    for path in args:
+        if path != "-r":
+            API.VFS.remove(resolve(path), recursive=recursive)
+
+
+def cmd_clear(args):
+    screen.clear()
+
+
+def cmd_seq(args):
+    count = int(args[0]) if args and args[0].isdigit() else 10
+    screen.write("".join(f"{n}\n" for n in range(1, count + 1)))
+
+
+def cmd_df(args):
+    stats = API.VFS.stats
+    echo(
+        f"{len(API.VFS.nodes)} entries, {API.VFS.dataEnd} bytes, "
+        f"{stats['commits']} commits"
+    )
+
+
+commands = {
+    name[4:]: value for name, value in globals().items() if name.startswith("cmd_")
+}
+
+
+def run(line):
+    entry.enterText("")
+    entry["focus"] = 1
+    screen.scroll(-screen.offset)
+    echo(f"{state['cwd']}> {line}")
+    try:
+        args = shlex.split(line)
+    except ValueError as e:
+        echo(f"parse error: {e}")
+        return
+    if not args:
+        return
+    command = commands.get(args[0])
+    if command is None:
+        echo(f"{args[0]}: command not found")
+        return
+    try:
+        command(args[1:])
+    except OSError as e:
+        echo(f"{args[0]}: {e}")
+
+
+def hibernate():
+    return {"cwd": state["cwd"], "output": screen.tail(HISTORY)}
+
+
+entry = DirectEntry(
+    parent=window.root,
+    text="",
+    scale=0.04,
+    width=(xmax - xmin - 0.06) / 0.04,
+    numLines=1,
+    focus=0,
+    pos=(xmin + 0.03, 0, ymin + 0.03),
+    frameColor=(0.12, 0.12, 0.12, 1),
+    text_fg=(1, 1, 1, 1),
+    text_align=TextNode.ALeft,
+    relief=DGG.FLAT,
+    command=run,
+)
+if state["output"]:
+    screen.write("\n".join(state["output"]) + "\n")
+else:
+    echo("Type 'help' for commands.")